@@ -300,73 +300,501 @@ Handles Round 1A (outline extraction) only - optimized for offline use
 import os
 import sys
 import argparse
+import cProfile
 import json
+import pstats
+import queue
+import threading
 import time
+import tracemalloc
+
+# Measured from here so the cold-start budget covers all of our own imports
+_IMPORT_START = time.perf_counter()
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 # Add src to Python path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from round1a.outline_extractor import OutlineExtractor
+from round1a.outline_extractor import OutlineExtractor, create_extractor
+from round1a.supervisor import run_supervised
 from shared.config import Config
+from shared.manifest import OutputManifest
+from shared.metrics import PipelineMetrics
+from shared.output_sink import JsonLinesSink
+from shared.pdf_utils import parse_page_ranges
+from shared.result_cache import ResultCache
+
+IMPORT_TIME = time.perf_counter() - _IMPORT_START
+
+
+# Per-process extractor used by --workers mode (set by _init_worker)
+_worker_extractor = None
+
+
+def collect_input_files(input_path: Path) -> List[Path]:
+    """
+    Collect the PDF and text files to process, in a deterministic order.
+    """
+    if input_path.is_file():
+        return [input_path] if input_path.suffix.lower() in ['.pdf', '.txt'] else []
+
+    pdf_files = sorted(input_path.glob("*.pdf"))
+    txt_files = sorted(input_path.glob("*.txt"))
+    return pdf_files + txt_files
+
+
+def output_file_for(file_path: Path, output_path: Path) -> Path:
+    """Path of the JSON output produced for an input file"""
+    return output_path / f"{file_path.stem}.json"
+
+
+def extract_file(extractor: OutlineExtractor, file_path: Path, collect_metrics: bool = False,
+                 data: Optional[bytes] = None) -> Tuple[Dict, Optional[Dict]]:
+    """
+    Extract the outline of a single file (from data, its content already in
+    memory, when given). Returns (outline, metrics dict or None).
+    """
+    if extractor.budgeted:
+        # Budgeted documents run in a child process that can be killed
+        return run_supervised(extractor, str(file_path), collect_metrics, data)
+
+    metrics = PipelineMetrics() if collect_metrics else None
+    outline_data = extractor.extract_outline(str(file_path), metrics, data=data)
+    return outline_data, metrics.to_dict() if metrics is not None else None
+
+
+def write_result(file_path: Path, output_path: Optional[Path], outline_data: Optional[Dict],
+                 metrics_data: Optional[Dict] = None, error: Optional[Exception] = None,
+                 elapsed: float = 0.0) -> Dict:
+    """
+    Write <stem>.json for an extracted outline (an empty one when extraction
+    failed with error) and return the file's result record. elapsed is the
+    time already spent extracting; the write is added to it.
+
+    Without an output_path nothing is written: the outline is returned in
+    the record's 'outline_data' for the batch driver's JSON Lines sink.
+    """
+    start_time = time.time()
+
+    if error is None and outline_data is not None and 'error' in outline_data:
+        # extract_outline reports the documents it could not process in the result
+        error = RuntimeError(outline_data['error'])
+
+    if output_path is None:
+        result = result_record(file_path, outline_data, metrics_data, error, elapsed)
+        result['outline_data'] = outline_data if error is None else {"title": "", "outline": []}
+        return result
+
+    output_file = output_file_for(file_path, output_path)
+    if error is None:
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(outline_data, f, indent=Config.JSON_INDENT, ensure_ascii=Config.ENSURE_ASCII)
+        except Exception as e:
+            error = e
+
+    if error is not None:
+        # Create empty output for failed files
+        with open(output_file, 'w') as f:
+            json.dump({"title": "", "outline": []}, f)
+
+    return result_record(file_path, outline_data, metrics_data, error,
+                         elapsed + time.time() - start_time)
+
+
+def result_record(file_path: Path, outline_data: Optional[Dict], metrics_data: Optional[Dict],
+                  error: Optional[Exception], elapsed: float) -> Dict:
+    """The result record of one file, used for progress and the batch summary"""
+    if error is not None:
+        return {
+            'file': file_path.name,
+            'status': 'error',
+            'time': elapsed,
+            'headings': 0,
+            'error': str(error)
+        }
+
+    result = {
+        'file': file_path.name,
+        'status': 'ok',
+        'time': elapsed,
+        'headings': len(outline_data.get('outline', []))
+    }
+    if outline_data.get('truncated'):
+        result['truncated'] = True
+    if metrics_data is not None:
+        result['metrics'] = metrics_data
+    return result
+
+
+def jsonl_record(file_path: Path, result: Dict, outline_data: Optional[Dict]) -> Dict:
+    """One JSON Lines output record: the file name, its outline and any error"""
+    record = {'file': file_path.name}
+    record.update(outline_data or {"title": "", "outline": []})
+    if result['status'] == 'error':
+        record['error'] = result['error']
+    return record
+
+
+def process_file(extractor: OutlineExtractor, file_path: Path, output_path: Optional[Path],
+                 collect_metrics: bool = False) -> Dict:
+    """
+    Extract the outline of a single file and write <stem>.json (see write_result).
+    Returns a small result record used for progress and the batch summary
+    (including the document's pipeline metrics when collect_metrics is set).
+    """
+    start_time = time.time()
+    try:
+        outline_data, metrics_data = extract_file(extractor, file_path, collect_metrics)
+        error = None
+    except Exception as e:
+        outline_data, metrics_data, error = None, None, e
+
+    return write_result(file_path, output_path, outline_data, metrics_data, error,
+                        elapsed=time.time() - start_time)
+
+
+def prefetch_files(files: List[Path], depth: int = Config.PREFETCH_DEPTH,
+                   max_mb: float = Config.PREFETCH_MAX_MB) -> Iterator[Tuple[Path, Optional[bytes]]]:
+    """
+    Yield (file_path, data) in order while reader threads load up to `depth`
+    upcoming files (at most max_mb of them in total) into memory, so that
+    slow storage is read while the previous document is being parsed.
+
+    data is None for a file larger than max_mb or one that could not be
+    read; it is then opened from disk as usual (and fails there, if it must).
+    """
+    # The window always admits at least the next file, so it is never empty when popped
+    depth = max(1, depth)
+    max_bytes = max_mb * 1024 * 1024
+    window = deque()  # (file_path, read future or None, buffered bytes)
+    buffered = 0
+    upcoming = iter(files)
+    next_file = next(upcoming, None)
+
+    with ThreadPoolExecutor(max_workers=Config.PREFETCH_READERS) as readers:
+        while window or next_file is not None:
+            while next_file is not None and len(window) < depth:
+                try:
+                    size = next_file.stat().st_size
+                except OSError:
+                    size = 0
+
+                if size > max_bytes:
+                    future, size = None, 0
+                elif window and buffered + size > max_bytes:
+                    break
+                else:
+                    future = readers.submit(next_file.read_bytes)
+
+                window.append((next_file, future, size))
+                buffered += size
+                next_file = next(upcoming, None)
+
+            file_path, future, size = window.popleft()
+            buffered -= size
+            data = None
+            if future is not None:
+                try:
+                    data = future.result()
+                except OSError:
+                    pass
+            yield file_path, data
+
+
+def process_files_pipelined(extractor: OutlineExtractor, files: List[Path], output_path: Optional[Path],
+                            finish: Callable[[Path, Dict], None], collect_metrics: bool = False,
+                            depth: int = Config.PREFETCH_DEPTH):
+    """
+    Single-process batch driver with the disk I/O overlapped with parsing:
+    upcoming files are prefetched into memory (see prefetch_files), the
+    calling thread extracts outlines from those bytes, and a background
+    thread writes the JSON outputs and reports them through finish. At most
+    Config.WRITE_QUEUE_SIZE outlines wait for the writer. An exception raised
+    by finish (e.g. a full disk under the JSON Lines sink) stops the batch and
+    is re-raised here.
+    """
+    writes = queue.Queue(maxsize=Config.WRITE_QUEUE_SIZE)
+    failures = []
+
+    def writer():
+        while True:
+            item = writes.get()
+            if item is None:
+                return
+            if failures:
+                continue  # keep draining so the parsing thread never blocks
+            file_path = item[0]
+            try:
+                result = write_result(file_path, output_path, *item[1:])
+            except Exception as e:
+                # Not even the empty output could be written
+                result = result_record(file_path, None, None, e, item[-1])
+            try:
+                finish(file_path, result)
+            except Exception as e:
+                failures.append(e)
+
+    writer_thread = threading.Thread(target=writer, name='output-writer', daemon=True)
+    writer_thread.start()
+
+    try:
+        for file_path, data in prefetch_files(files, depth):
+            if failures:
+                break
+            print(f"Processing: {file_path.name}")
+            start_time = time.time()
+            try:
+                outline_data, metrics_data = extract_file(extractor, file_path, collect_metrics, data)
+                error = None
+            except Exception as e:
+                outline_data, metrics_data, error = None, None, e
+            writes.put((file_path, outline_data, metrics_data, error, time.time() - start_time))
+    finally:
+        writes.put(None)
+        writer_thread.join()
+
+    if failures:
+        raise failures[0]
+
+
+def _init_worker(extractor_options: Optional[Dict] = None):
+    """Create one OutlineExtractor per worker process"""
+    global _worker_extractor
+    _worker_extractor = create_extractor(extractor_options)
+
+
+def _process_file_in_worker(file_path: str, output_dir: Optional[str], collect_metrics: bool = False) -> Dict:
+    """Entry point executed inside a pool worker (output_dir None: see write_result)"""
+    return process_file(_worker_extractor, Path(file_path), Path(output_dir) if output_dir else None,
+                        collect_metrics)
+
 
+def report_result(result: Dict):
+    """Print the progress line for a finished file"""
+    if result['status'] == 'ok':
+        print(f"✅ Completed {result['file']} in {result['time']:.2f}s")
 
-def process_round1a(input_dir: str, output_dir: str):
+        if result.get('truncated'):
+            print(f"⚠️  Warning: {result['file']} exceeded its budget; partial outline written")
+
+        # Check performance constraint (10s for 50 pages)
+        if result['time'] > Config.ROUND1A_MAX_TIME:
+            print(f"⚠️  Warning: Processing time ({result['time']:.2f}s) exceeds limit ({Config.ROUND1A_MAX_TIME}s)")
+    else:
+        print(f"❌ Error processing {result['file']}: {result['error']}")
+
+
+def print_summary(results: List[Dict], wall_time: float, skipped: int = 0):
+    """Print a deterministic (name-ordered) summary of a batch run"""
+    results = sorted(results, key=lambda r: r['file'])
+    succeeded = [r for r in results if r['status'] == 'ok']
+    failed = [r for r in results if r['status'] == 'error']
+    truncated = [r for r in results if r.get('truncated')]
+    cpu_time = sum(r['time'] for r in results)
+
+    print("-" * 50)
+    print(f"Files processed: {len(results)} ({len(succeeded)} ok, {len(failed)} failed)")
+    if skipped:
+        print(f"Skipped (up to date): {skipped}")
+    if truncated:
+        print(f"Truncated (over budget): {', '.join(r['file'] for r in truncated)}")
+    print(f"Wall time: {wall_time:.2f}s, summed per-file time: {cpu_time:.2f}s")
+    if results:
+        slowest = max(results, key=lambda r: (r['time'], r['file']))
+        print(f"Slowest: {slowest['file']} ({slowest['time']:.2f}s)")
+    for result in failed:
+        print(f"  Failed: {result['file']}: {result['error']}")
+
+
+def process_round1a(input_dir: str, output_dir: str, workers: int = 1,
+                    extractor_options: Optional[Dict] = None, incremental: bool = False,
+                    collect_metrics: bool = False, prefetch: Optional[int] = None,
+                    sink_options: Optional[Dict] = None):
     """
     Process Round 1A: Extract outlines from PDFs using the new offline-first,
-    high-accuracy extractor.
+    high-accuracy extractor. With workers > 1 the files are fanned out over a
+    process pool, each worker owning its own OutlineExtractor built from
+    extractor_options (page_workers, streaming, cache_dir, time_budget,
+    rss_budget_mb, page_spec, max_pages, use_toc, merge_lines). In incremental
+    mode, inputs whose outputs are recorded as up to date in the output
+    manifest are skipped, and every produced output is recorded. With
+    collect_metrics, per-stage pipeline metrics are aggregated over the batch.
+    With prefetch (and a single worker), up to that many upcoming files are
+    read ahead and outputs are written in the background (see
+    process_files_pipelined). With sink_options (max_mb, compress), outlines
+    are appended to rotating JSON Lines parts instead of <stem>.json files
+    (see JsonLinesSink).
     """
     print("Starting Round 1A: Advanced Document Outline Extraction (Offline Optimized)")
-    
-    # Use the new, improved OutlineExtractor
-    extractor = OutlineExtractor()
-    
+
     input_path = Path(input_dir)
     output_path = Path(output_dir)
-    
+
     # Ensure output directory exists
     output_path.mkdir(parents=True, exist_ok=True)
-    
+
     # Handle both single files and directories
-    if input_path.is_file():
-        all_files = [input_path] if input_path.suffix.lower() in ['.pdf', '.txt'] else []
-    else:
-        pdf_files = list(input_path.glob("*.pdf"))
-        txt_files = list(input_path.glob("*.txt"))
-        all_files = pdf_files + txt_files
-    
+    all_files = collect_input_files(input_path)
+
     if not all_files:
         print("No PDF or text files found in input directory")
         return
-    
-    for file_path in all_files:
-        print(f"Processing: {file_path.name}")
-        start_time = time.time()
-        
+
+    manifest = None
+    # Outputs made with other page selection / TOC / line options are not up to date
+    variant = create_extractor({**(extractor_options or {}), 'cache_dir': None}).output_variant()
+    sink = JsonLinesSink(output_path, **sink_options) if sink_options is not None else None
+    # <stem>.json files are written where the file is extracted, JSON Lines records by finish()
+    file_output_path = output_path if sink is None else None
+
+    def expected_output(file_path: Path) -> Optional[Path]:
+        if sink is None:
+            return output_file_for(file_path, output_path)
+        # The committed JSON Lines part the file's record went to
+        part = manifest.recorded_output(file_path)
+        return output_path / part if part and sink.is_part(part) else None
+
+    skipped = 0
+    if incremental:
+        manifest = OutputManifest(output_path)
+        pending = [f for f in all_files if not manifest.is_up_to_date(f, expected_output(f), variant)]
+        skipped = len(all_files) - len(pending)
+        print(f"Incremental run: {len(pending)} new or changed, {skipped} up to date")
+        all_files = pending
+
+    start_time = time.time()
+    results = []
+
+    def finish(file_path: Path, result: Dict):
+        outline_data = result.pop('outline_data', None)
+        if sink is not None:
+            output_file = sink.write(jsonl_record(file_path, result, outline_data))
+        else:
+            output_file = output_file_for(file_path, output_path)
+
+        report_result(result)
+        results.append(result)
+        if manifest is not None:
+            manifest.record(file_path, output_file, result['status'], variant)
+
+    workers = max(1, min(workers, len(all_files)))
+
+    try:
+        if all_files and workers == 1:
+            # Use the new, improved OutlineExtractor
+            extractor = create_extractor(extractor_options)
+
+            if prefetch:
+                process_files_pipelined(extractor, all_files, file_output_path, finish,
+                                        collect_metrics, depth=prefetch)
+            else:
+                for file_path in all_files:
+                    print(f"Processing: {file_path.name}")
+                    result = process_file(extractor, file_path, file_output_path, collect_metrics)
+                    finish(file_path, result)
+        elif all_files:
+            print(f"Processing {len(all_files)} files with {workers} worker processes")
+            if prefetch:
+                # Each worker already overlaps its reads with the others' parsing
+                print("Note: --prefetch only applies to a single worker; ignored")
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(extractor_options,)) as pool:
+                worker_output_dir = str(file_output_path) if file_output_path else None
+                futures = {
+                    pool.submit(_process_file_in_worker, str(file_path), worker_output_dir,
+                                collect_metrics): file_path
+                    for file_path in all_files
+                }
+
+                # Results are reported (per-file outputs already written) as they complete
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # The worker itself died (e.g. killed by the OS)
+                        result = {'file': file_path.name, 'status': 'error', 'time': 0.0,
+                                  'headings': 0, 'error': str(e)}
+                    finish(file_path, result)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    if manifest is not None:
+        manifest.compact()
+
+    print_summary(results, time.time() - start_time, skipped=skipped)
+    if sink is not None and sink.parts:
+        print(f"JSON Lines output: {', '.join(part.name for part in sink.parts)}")
+
+    if collect_metrics:
+        batch_metrics = PipelineMetrics()
+        for result in results:
+            if 'metrics' in result:
+                batch_metrics.merge(PipelineMetrics.from_dict(result['metrics']))
+        print("\n".join(batch_metrics.format_summary()))
+
+
+def profile_file(file_path: Path, output_dir: str, extractor_options: Optional[Dict] = None):
+    """
+    Extract a single file under cProfile and tracemalloc (result cache bypassed).
+    Writes <stem>.json and <stem>.prof to output_dir and prints the hottest
+    functions and the largest allocation sites.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    options = dict(extractor_options or {})
+    options['cache_dir'] = None
+    extractor = create_extractor(options)
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    result = process_file(extractor, file_path, output_path, collect_metrics=True)
+    profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report_result(result)
+    print("\n".join(PipelineMetrics.from_dict(result.get('metrics', {})).format_summary()))
+
+    profile_file_path = output_path / f"{file_path.stem}.prof"
+    profiler.dump_stats(str(profile_file_path))
+    print(f"cProfile stats written to {profile_file_path}")
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+    print(f"tracemalloc peak: {peak / (1024 * 1024):.1f} MB; largest allocation sites still held:")
+    for stat in snapshot.statistics('lineno')[:10]:
+        print(f"  {stat}")
+
+
+def page_spec_argument(value: str) -> str:
+    """argparse type for --pages: "outline" or a page range list such as 1-5,8"""
+    if value != 'outline':
         try:
-            # Extract outline using the new method
-            outline_data = extractor.extract_outline(str(file_path))
-            
-            # Generate output filename
-            output_file = output_path / f"{file_path.stem}.json"
-            
-            # Save results
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(outline_data, f, indent=2, ensure_ascii=False)
-            
-            processing_time = time.time() - start_time
-            print(f"✅ Completed {file_path.name} in {processing_time:.2f}s")
-            
-            # Check performance constraint (10s for 50 pages)
-            if processing_time > Config.ROUND1A_MAX_TIME:
-                print(f"⚠️  Warning: Processing time ({processing_time:.2f}s) exceeds limit ({Config.ROUND1A_MAX_TIME}s)")
-                
-        except Exception as e:
-            print(f"❌ Error processing {file_path.name}: {str(e)}")
-            # Create empty output for failed files
-            output_file = output_path / f"{file_path.stem}.json"
-            with open(output_file, 'w') as f:
-                json.dump({"title": "", "outline": []}, f)
+            parse_page_ranges(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def positive_int_argument(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def main():
@@ -378,10 +806,96 @@ def main():
                         help='Input directory path')
     parser.add_argument('--output', default='./output',
                         help='Output directory path')
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f'Number of worker processes (e.g. {Config.CPU_CORES}); 1 processes files serially')
+    parser.add_argument('--page-workers', type=int, default=1,
+                        help=f'Parse the pages of PDFs with at least {Config.PAGE_PARALLEL_MIN_PAGES} pages in this many processes')
+    parser.add_argument('--stream', action='store_true',
+                        help='Process documents page by page in bounded memory (ignores --page-workers)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process new or changed inputs, tracked in an output manifest')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Collect per-stage timings, counts and rule hits and print a batch summary')
+    parser.add_argument('--max-pages', type=positive_int_argument, nargs='?', const=Config.MAX_PDF_PAGES, metavar='N',
+                        help=f'Parse at most N pages per PDF (default {Config.MAX_PDF_PAGES}); later pages are never read')
+    parser.add_argument('--pages', type=page_spec_argument, metavar='SPEC',
+                        help='Only parse these PDF pages: a range list such as 1-5,8,20- or '
+                             '"outline" for the pages the PDF\'s bookmarks point at')
+    parser.add_argument('--use-toc', action='store_true',
+                        help="Use a PDF's embedded bookmarks as its outline when they match the page text")
+    parser.add_argument('--merge-lines', action='store_true',
+                        help='Join headings that wrap over several lines in the same style')
+    parser.add_argument('--time-budget', type=float, nargs='?', const=Config.DOCUMENT_TIME_BUDGET,
+                        metavar='SECONDS',
+                        help=f'Stop each document after this many seconds (default {Config.DOCUMENT_TIME_BUDGET}) '
+                             'and write the partial outline, marked "truncated"')
+    parser.add_argument('--rss-budget', type=float, nargs='?', const=Config.DOCUMENT_RSS_BUDGET_MB,
+                        metavar='MB',
+                        help=f'Stop each document once its worker uses this much memory (default {Config.DOCUMENT_RSS_BUDGET_MB} MB)')
+    parser.add_argument('--prefetch', type=positive_int_argument, nargs='?', const=Config.PREFETCH_DEPTH, metavar='N',
+                        help='Read up to N upcoming files ahead and write outputs in the background '
+                             f'(single worker; default N {Config.PREFETCH_DEPTH})')
+    parser.add_argument('--output-format', choices=['json', 'jsonl'], default='json',
+                        help='json: one <stem>.json per input; jsonl: compact records appended to '
+                             f'rotating {Config.JSONL_PREFIX}-NNNNN.jsonl parts')
+    parser.add_argument('--jsonl-max-mb', type=float, default=Config.JSONL_ROTATE_MB, metavar='MB',
+                        help=f'Start a new JSON Lines part after this many MB of records (default {Config.JSONL_ROTATE_MB})')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Gzip-compress the JSON Lines parts (.jsonl.gz)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile a single input file with cProfile and tracemalloc')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run as a long-lived extraction server with --workers warm worker processes')
+    parser.add_argument('--host', default=Config.SERVER_HOST,
+                        help='Address the server listens on')
+    parser.add_argument('--port', type=int, default=Config.SERVER_PORT,
+                        help='HTTP port of the server')
+    parser.add_argument('--socket', metavar='PATH',
+                        help='Serve HTTP on this Unix socket instead of a TCP port')
+    parser.add_argument('--queue-size', type=int, default=Config.SERVER_QUEUE_SIZE,
+                        help='Requests that may wait for a server worker before new ones are rejected with 503')
+    parser.add_argument('--warm-nlp', action='store_true',
+                        help='Also load the TextProcessor models in every server worker')
+    parser.add_argument('--cache-dir', default=Config.CACHE_DIR,
+                        help='Directory of the persistent result cache')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the result cache and re-extract every document')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Purge the result cache before processing')
     
     args = parser.parse_args()
     
     print(f"Adobe India Hackathon - Round {args.round.upper()}")
+    if IMPORT_TIME > Config.COLD_START_BUDGET:
+        print(f"⚠️  Warning: Start-up imports took {IMPORT_TIME:.2f}s (budget {Config.COLD_START_BUDGET}s)")
+    
+    if args.clear_cache:
+        ResultCache(args.cache_dir).clear()
+        print(f"Cleared result cache: {args.cache_dir}")
+
+    extractor_options = {
+        'page_workers': args.page_workers,
+        'streaming': args.stream,
+        'cache_dir': None if args.no_cache else args.cache_dir,
+        'time_budget': args.time_budget,
+        'rss_budget_mb': args.rss_budget,
+        'page_spec': args.pages,
+        'max_pages': args.max_pages,
+        'use_toc': args.use_toc,
+        'merge_lines': args.merge_lines
+    }
+
+    sink_options = None
+    if args.output_format == 'jsonl':
+        sink_options = {'max_mb': args.jsonl_max_mb, 'compress': args.gzip}
+
+    if args.serve:
+        # Imported here so batch runs do not pay for the HTTP stack
+        from round1a.server import serve
+        serve(args.workers, extractor_options, host=args.host, port=args.port,
+              socket_path=args.socket, queue_size=args.queue_size, warm_nlp=args.warm_nlp)
+        return
+
     print(f"Input: {args.input}")
     print(f"Output: {args.output}")
     print("-" * 50)
@@ -391,9 +905,17 @@ def main():
         print(f"❌ Input directory not found: {args.input}")
         sys.exit(1)
     
+    if args.profile:
+        if not os.path.isfile(args.input):
+            print("❌ --profile needs a single input file")
+            sys.exit(1)
+        profile_file(Path(args.input), args.output, extractor_options)
     # Process Round 1A only
-    if args.round == '1a':
-        process_round1a(args.input, args.output)
+    elif args.round == '1a':
+        process_round1a(args.input, args.output, workers=args.workers,
+                        extractor_options=extractor_options, incremental=args.incremental,
+                        collect_metrics=args.metrics, prefetch=args.prefetch,
+                        sink_options=sink_options)
     else:
         print("❌ Only Round 1A is supported in this version")
         sys.exit(1)
@@ -403,4 +925,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,14 +5,18 @@ Extracts structured outlines (Title, H1, H2, H3) from PDF documents
 
 import json
 import statistics
-from typing import List, Dict, Tuple, Optional
+from collections import Counter
+from typing import Callable, List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import re
+import time
 
-from shared.pdf_utils import extract_document_content, TextBlock
-from shared.text_processor import TextProcessor
+from shared.pdf_utils import extract_document_content, extract_toc_headings, iter_document_pages, TextBlock
+from shared.budget import DocumentBudget
 from shared.config import Config
-from shared.text_utils import detect_headings_from_text
+from shared.metrics import PipelineMetrics, NULL_METRICS
+from shared.result_cache import ResultCache
+from shared.text_utils import StreamingHeadingDetector
 
 
 class OutlineExtractor:
@@ -21,40 +25,253 @@ class OutlineExtractor:
     offline performance and high accuracy using rich text features.
     """
     
-    def __init__(self):
-        # No external dependencies needed for this offline-first approach
-        pass
+    def __init__(self, page_workers: int = 1, streaming: bool = False,
+                 cache: Optional[ResultCache] = None, time_budget: Optional[float] = None,
+                 rss_budget_mb: Optional[float] = None, page_spec: Optional[str] = None,
+                 max_pages: Optional[int] = None, use_toc: bool = False,
+                 merge_lines: bool = False):
+        # No external dependencies needed for this offline-first approach.
+        # page_workers > 1 parses the pages of large PDFs in parallel processes;
+        # streaming processes documents page by page in bounded memory;
+        # cache, when given, short-circuits documents that were seen before;
+        # time_budget / rss_budget_mb stop a document early (see extract_outline);
+        # page_spec / max_pages limit which pages are read at all (see select_pages);
+        # use_toc returns the PDF's own bookmarks when they check out;
+        # merge_lines joins headings wrapped over several lines.
+        self.page_workers = page_workers
+        self.streaming = streaming
+        self.cache = cache
+        self.time_budget = time_budget
+        self.rss_budget_mb = rss_budget_mb
+        self.page_spec = page_spec
+        self.max_pages = max_pages
+        self.use_toc = use_toc
+        self.merge_lines = merge_lines
+
+    @property
+    def budgeted(self) -> bool:
+        return self.time_budget is not None or self.rss_budget_mb is not None
     
-    def extract_outline(self, file_path: str) -> Dict:
+    def extract_outline(self, file_path: str, metrics: Optional[PipelineMetrics] = None,
+                        checkpoint: Optional[Callable[[Dict], None]] = None,
+                        data: Optional[bytes] = None) -> Dict:
         """
         Extract a structured outline from a PDF file by analyzing its
-        layout, font styles, and text patterns.
+        layout, font styles, and text patterns. Pass a PipelineMetrics to
+        collect per-stage timings, counts and rule hits for this document.
+
+        When a time or memory budget is set, the document is processed page by
+        page and extraction stops at the first page boundary past the budget;
+        the outline found so far is returned with "truncated": true. checkpoint,
+        if given, periodically receives such a partial result while a budgeted
+        document is processed (used by the supervisor to salvage killed workers).
+
+        data, if given, is the file's content already read into memory (e.g. by
+        a prefetching batch driver); it is parsed instead of reading file_path.
+
+        A document that cannot be processed yields an empty outline with an
+        "error" key holding the reason, so callers can record the failure.
         """
+        metrics = metrics if metrics is not None else NULL_METRICS
+        if metrics.enabled:
+            metrics.documents += 1
+
         try:
-            # Extract rich text blocks from the PDF
-            doc_content = extract_document_content(file_path)
-            
-            if not doc_content or not doc_content['text_blocks']:
-                return {"title": "", "outline": []}
-            
-            # Detect headings using our advanced offline logic
-            headings = detect_headings_from_text(doc_content['text_blocks'])
-            
-            # Extract a title for the document
-            title = self._extract_title(headings, doc_content['text_blocks'])
-            
-            # Build the final hierarchical outline
-            outline = self._build_hierarchical_outline(headings)
-            
-            return {
-                "title": title,
-                "outline": outline
-            }
+            cache_key = None
+            if self.cache is not None:
+                with metrics.stage('cache_lookup'):
+                    cache_key = self.cache.key_for(file_path, self.output_variant(), data)
+                    cached = self.cache.get(cache_key)
+                if cached is not None:
+                    metrics.count('cache_hits')
+                    return cached
+
+            result = self._extract_outline_from_toc(file_path, metrics, data) if self.use_toc else None
+
+            if result is not None:
+                metrics.count('toc_hits')
+            elif self.budgeted:
+                budget = DocumentBudget(self.time_budget, self.rss_budget_mb)
+                result = self._extract_outline_streaming(file_path, metrics, budget, checkpoint, data)
+            elif self.streaming:
+                result = self._extract_outline_streaming(file_path, metrics, data=data)
+            else:
+                result = self._extract_outline(file_path, metrics, data)
+
+            if result.get('truncated'):
+                metrics.count('truncated')
+            elif cache_key is not None:
+                with metrics.stage('cache_store'):
+                    self.cache.put(cache_key, result)
+
+            metrics.count('headings', len(result['outline']))
+            return result
             
         except Exception as e:
+            metrics.count('errors')
             print(f"Error extracting outline from {file_path}: {e}")
+            return {"title": "", "outline": [], "error": str(e)}
+
+    def extract_outline_with_metrics(self, file_path: str) -> Tuple[Dict, PipelineMetrics]:
+        """
+        extract_outline plus the PipelineMetrics collected for the document.
+        """
+        metrics = PipelineMetrics()
+        result = self.extract_outline(file_path, metrics)
+        return result, metrics
+
+    def output_variant(self) -> str:
+        """
+        Options that change the extracted outline and must therefore be part
+        of the cache key and of the incremental manifest (parallelism,
+        streaming and budgets do not; truncated results are never cached).
+        """
+        variant = []
+        if self.page_spec:
+            variant.append(f"pages={self.page_spec}")
+        if self.max_pages is not None:
+            variant.append(f"max_pages={self.max_pages}")
+        if self.use_toc:
+            variant.append("toc")
+        if self.merge_lines:
+            variant.append("merge_lines")
+        return "|".join(variant)
+
+    def _extract_outline_from_toc(self, file_path: str, metrics: PipelineMetrics,
+                                  data: Optional[bytes] = None) -> Optional[Dict]:
+        """
+        Fast path: the outline from the PDF's embedded table of contents,
+        without span-level analysis. None if the document has no bookmarks
+        or they do not match the page text.
+        """
+        with metrics.stage('toc'):
+            headings = extract_toc_headings(file_path, self.page_spec, self.max_pages, metrics, data)
+        if headings is None:
+            return None
+
+        level_mapping = {1: "H1", 2: "H2", 3: "H3"}
+        # Bookmark order is the reading order, so it is kept as-is (stable by page)
+        outline = [{"level": level_mapping.get(heading['level'], "H3"),
+                    "text": heading['text'],
+                    "page": heading['page_num']}
+                   for heading in sorted(headings, key=lambda h: h['page_num'])]
+
+        return {
+            "title": self._extract_title(headings, []),
+            "outline": outline
+        }
+
+    def _extract_outline(self, file_path: str, metrics: PipelineMetrics,
+                         data: Optional[bytes] = None) -> Dict:
+        """
+        Extract the outline from the fully materialised document content.
+        """
+        # Extract rich text blocks from the PDF
+        document = extract_document_content(file_path, page_workers=self.page_workers,
+                                            metrics=metrics, page_spec=self.page_spec,
+                                            max_pages=self.max_pages, merge_lines=self.merge_lines,
+                                            data=data)
+        
+        if not document.text_blocks:
+            return {"title": "", "outline": []}
+        
+        # Detect headings using our advanced offline logic (computed once, on the document)
+        with metrics.stage('heading_rules'):
+            headings = document.headings
+        metrics.count('candidates', document.candidate_count)
+        if metrics.enabled:
+            metrics.rule_hits.update(document.rule_hits)
+        
+        # Extract a title for the document
+        with metrics.stage('title'):
+            title = self._extract_title(headings, document.text_blocks)
+        
+        # Build the final hierarchical outline
+        with metrics.stage('outline_build'):
+            outline = self._build_hierarchical_outline(headings)
+        
+        return {
+            "title": title,
+            "outline": outline
+        }
+
+    def _extract_outline_streaming(self, file_path: str, metrics: PipelineMetrics,
+                                   budget: Optional[DocumentBudget] = None,
+                                   checkpoint: Optional[Callable[[Dict], None]] = None,
+                                   data: Optional[bytes] = None) -> Dict:
+        """
+        Page-by-page variant of _extract_outline: pages are parsed and fed to the
+        heading detector as they are produced, so only heading candidates (and
+        the first page, for the title fallback) are kept in memory. With a
+        budget, pages stop being read once it is exhausted.
+        """
+        detector = StreamingHeadingDetector(rule_hits=self._rule_hits(metrics))
+        first_page_blocks = []
+        page_count = 0
+        truncated = None
+        last_checkpoint = time.perf_counter()
+        checkpoint_interval = Config.BUDGET_CHECKPOINT_INTERVAL
+
+        for page_num, page_blocks in iter_document_pages(file_path, metrics, self.page_spec,
+                                                         self.max_pages, self.merge_lines, data):
+            page_count += 1
+            if page_num == 1:
+                first_page_blocks = page_blocks
+            with metrics.stage('heading_rules'):
+                detector.feed(page_blocks)
+
+            if budget is None:
+                continue
+            truncated = budget.exceeded()
+            if truncated:
+                print(f"Warning: stopped {file_path} after page {page_num}: {truncated}")
+                break
+            if checkpoint is not None and time.perf_counter() - last_checkpoint >= checkpoint_interval:
+                started = time.perf_counter()
+                checkpoint(self._streaming_result(detector, first_page_blocks, truncated=True))
+                last_checkpoint = time.perf_counter()
+                # A partial outline costs more the further into the document we are;
+                # space them out so they never take more than a fixed share of the time
+                checkpoint_interval = max(Config.BUDGET_CHECKPOINT_INTERVAL,
+                                          (last_checkpoint - started) / Config.BUDGET_CHECKPOINT_MAX_OVERHEAD)
+
+        if not page_count:
             return {"title": "", "outline": []}
 
+        with metrics.stage('heading_rules'):
+            headings = detector.finish()
+        metrics.count('candidates', len(detector.candidates))
+
+        with metrics.stage('title'):
+            title = self._extract_title(headings, first_page_blocks)
+        with metrics.stage('outline_build'):
+            outline = self._build_hierarchical_outline(headings)
+
+        result = {
+            "title": title,
+            "outline": outline
+        }
+        if truncated:
+            result["truncated"] = True
+        return result
+
+    def _streaming_result(self, detector: StreamingHeadingDetector, first_page_blocks: List[TextBlock],
+                          truncated: bool = False) -> Dict:
+        """Outline of the pages fed to detector so far (rule hits are not recorded)"""
+        headings = detector.finish(record_hits=False)
+        result = {
+            "title": self._extract_title(headings, first_page_blocks),
+            "outline": self._build_hierarchical_outline(headings)
+        }
+        if truncated:
+            result["truncated"] = True
+        return result
+
+    @staticmethod
+    def _rule_hits(metrics: PipelineMetrics) -> Optional[Counter]:
+        # Rule hits are only accumulated when metrics are being collected
+        return metrics.rule_hits if metrics.enabled else None
+
     def _extract_title(self, headings: List[Dict], text_blocks: List[TextBlock]) -> str:
         """
         Extract the document title from the highest-level heading or the
@@ -72,7 +289,7 @@ class OutlineExtractor:
             return ""
             
         # Sort by font size (desc) and then position (asc)
-        sorted_blocks = sorted(first_page_blocks, key=lambda b: (-b.font_size, b.bbox[1]))
+        sorted_blocks = sorted(first_page_blocks, key=lambda b: (-b.font_size, b.y0))
         return sorted_blocks[0].text if sorted_blocks else ""
 
     def _build_hierarchical_outline(self, headings: List[Dict]) -> List[Dict]:
@@ -104,3 +321,14 @@ class OutlineExtractor:
             outline.append(outline_item)
         
         return outline
+
+
+def create_extractor(extractor_options: Optional[Dict] = None) -> OutlineExtractor:
+    """
+    Build an OutlineExtractor from plain (picklable) options so that pool
+    workers can construct their own instance.
+    """
+    options = dict(extractor_options or {})
+    cache_dir = options.pop('cache_dir', None)
+    cache = ResultCache(cache_dir) if cache_dir else None
+    return OutlineExtractor(cache=cache, **options)
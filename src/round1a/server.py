@@ -0,0 +1,277 @@
+"""
+Long-lived Round 1A extraction server
+
+Keeps a pool of pre-forked worker processes with OutlineExtractor (and
+optionally the TextProcessor models) already loaded, so a request only pays
+for parsing the document:
+
+    python src/main.py --serve --workers 8                  # http://127.0.0.1:8765
+    python src/main.py --serve --socket /tmp/round1a.sock   # Unix socket
+
+    curl -s -X POST localhost:8765/outline -d '{"path": "/app/input/doc.pdf"}'
+    curl -s localhost:8765/health
+
+POST /outline returns the same JSON the batch mode writes to <stem>.json.
+Requests beyond the workers wait in a bounded queue; once it is full the
+server answers 503 with Retry-After instead of accepting more work.
+"""
+
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Dict, Optional
+
+from round1a.outline_extractor import create_extractor
+from round1a.supervisor import run_supervised
+from shared.config import Config
+
+
+# Per-process extractor of the server's workers (set by _init_worker)
+_worker_extractor = None
+
+
+def _init_worker(extractor_options: Optional[Dict] = None, warm_nlp: bool = False):
+    """Import and build everything a request needs once per worker process"""
+    global _worker_extractor
+    _worker_extractor = create_extractor(extractor_options)
+
+    if warm_nlp:
+        from shared.text_processor import TextProcessor
+        TextProcessor().warmup()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _extract_in_worker(file_path: str) -> Dict:
+    if _worker_extractor.budgeted:
+        result, _ = run_supervised(_worker_extractor, file_path)
+        return result
+    return _worker_extractor.extract_outline(file_path)
+
+
+class ServerBusy(Exception):
+    """Raised when the request queue is full"""
+
+
+class ExtractionService:
+    """
+    Bounded front end to a process pool of warm extractors.
+
+    At most `workers` documents are parsed at once and at most `queue_size`
+    more wait for a worker; further requests are rejected immediately
+    (backpressure) rather than queued without limit. A pool whose worker
+    died is replaced so later requests keep being served.
+    """
+
+    def __init__(self, workers: int, extractor_options: Optional[Dict] = None,
+                 queue_size: int = Config.SERVER_QUEUE_SIZE, warm_nlp: bool = False,
+                 request_timeout: float = Config.SERVER_REQUEST_TIMEOUT):
+        self.workers = max(1, workers)
+        self.extractor_options = extractor_options
+        self.queue_size = queue_size
+        self.warm_nlp = warm_nlp
+        self.request_timeout = request_timeout
+
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.in_flight = 0
+        self.counts = {'served': 0, 'rejected': 0, 'failed': 0, 'timed_out': 0}
+
+        self._pool = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.extractor_options, self.warm_nlp))
+        # Pre-fork: start the workers (running their initializer) before the first request
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _count(self, name: str, in_flight: int = 0):
+        with self._lock:
+            if name:
+                self.counts[name] += 1
+            self.in_flight += in_flight
+
+    def _job_done(self, future=None):
+        """Free the slot of a job once it has really finished (or was cancelled)"""
+        self._count('', -1)
+        self._slots.release()
+
+    def _restart_pool(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is pool:
+                print("Warning: a server worker died; restarting the worker pool")
+                self._pool = self._start_pool()
+                pool.shutdown(wait=False)
+
+    def extract(self, file_path: str) -> Dict:
+        """
+        Outline of file_path; raises ServerBusy when the queue is full.
+
+        A request that times out gives up waiting, but its job keeps its slot
+        (and counts as in flight) until the worker is done with it, so slow
+        documents cannot push the pool's backlog past workers + queue_size.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise ServerBusy()
+
+        self._count('', 1)
+        pool = self._pool
+        try:
+            future = pool.submit(_extract_in_worker, file_path)
+        except BrokenProcessPool:
+            self._job_done()
+            self._count('failed')
+            self._restart_pool(pool)
+            raise
+        future.add_done_callback(self._job_done)
+
+        try:
+            result = future.result(timeout=self.request_timeout)
+            self._count('served')
+            return result
+        except FutureTimeoutError:
+            # Only succeeds while the job is still queued; a running one finishes on its own
+            future.cancel()
+            self._count('timed_out')
+            raise
+        except BrokenProcessPool:
+            self._count('failed')
+            self._restart_pool(pool)
+            raise
+        except Exception:
+            self._count('failed')
+            raise
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'status': 'ok',
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self.in_flight,
+                'uptime_s': round(time.time() - self.started, 1),
+                'extractor_version': Config.EXTRACTOR_VERSION,
+                **self.counts
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class OutlineRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end: POST /outline {"path": ...} and GET /health"""
+
+    server_version = "Round1A"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != '/outline':
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            file_path = request['path']
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": 'expected a JSON body {"path": "<file>"}'})
+            return
+
+        if not isinstance(file_path, str) or not os.path.isfile(file_path):
+            self._send_json(404, {"error": f"file not found: {file_path}"})
+            return
+
+        try:
+            result = self.server.service.extract(file_path)
+            self._send_json(500 if 'error' in result else 200, result)
+        except ServerBusy:
+            self._send_json(503, {"error": "server busy, retry later"}, {'Retry-After': '1'})
+        except FutureTimeoutError:
+            self._send_json(504, {"error": f"extraction took longer than {self.server.service.request_timeout}s"})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload, indent=Config.JSON_INDENT, ensure_ascii=Config.ENSURE_ASCII).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class OutlineHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: ExtractionService, verbose: bool = False):
+        super().__init__(address, OutlineRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+class OutlineUnixServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: ExtractionService, verbose: bool = False):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a previous server
+        super().__init__(socket_path, OutlineRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def serve(workers: int, extractor_options: Optional[Dict] = None, host: str = Config.SERVER_HOST,
+          port: int = Config.SERVER_PORT, socket_path: Optional[str] = None,
+          queue_size: int = Config.SERVER_QUEUE_SIZE, warm_nlp: bool = False, verbose: bool = False):
+    """Run the extraction server until interrupted (Ctrl+C or SIGTERM)"""
+    print(f"Starting {workers} warm extraction workers...")
+    service = ExtractionService(workers, extractor_options, queue_size=queue_size, warm_nlp=warm_nlp)
+
+    if socket_path:
+        server = OutlineUnixServer(socket_path, service, verbose)
+        print(f"Serving Round 1A outlines on unix:{socket_path}")
+    else:
+        server = OutlineHTTPServer((host, port), service, verbose)
+        print(f"Serving Round 1A outlines on http://{host}:{server.server_address[1]}")
+
+    # serve_forever must be stopped from another thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("Shutting down extraction server")
+        server.server_close()
+        service.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,85 @@
+"""
+Supervised extraction: one killable child process per document
+"""
+
+from typing import Dict, Optional, Tuple
+
+from round1a.outline_extractor import OutlineExtractor
+from shared.budget import DocumentBudget
+from shared.config import Config
+from shared.metrics import PipelineMetrics
+from shared.processes import process_context
+
+
+def _run_child(extractor: OutlineExtractor, file_path: str, collect_metrics: bool, connection,
+               data: Optional[bytes] = None):
+    """Child process body: stream partial outlines, then the final result"""
+    metrics = PipelineMetrics() if collect_metrics else None
+    result = extractor.extract_outline(file_path, metrics,
+                                       checkpoint=lambda partial: connection.send(('checkpoint', partial)),
+                                       data=data)
+    connection.send(('result', result, metrics.to_dict() if metrics is not None else None))
+    connection.close()
+
+
+def run_supervised(extractor: OutlineExtractor, file_path: str, collect_metrics: bool = False,
+                   data: Optional[bytes] = None) -> Tuple[Dict, Optional[Dict]]:
+    """
+    Extract file_path in a child process and return (result, metrics dict).
+
+    The child enforces the extractor's budgets itself at page boundaries. If
+    it overruns them anyway (e.g. stuck inside one malformed page) by more
+    than Config.BUDGET_KILL_GRACE seconds or Config.BUDGET_RSS_KILL_FACTOR
+    times the memory budget, or dies, it is killed and the last partial
+    outline it reported is returned, marked "truncated". data, if given, is
+    the file's content already in memory (see OutlineExtractor.extract_outline).
+    """
+    hard_limit = DocumentBudget(
+        extractor.time_budget + Config.BUDGET_KILL_GRACE if extractor.time_budget is not None else None,
+        extractor.rss_budget_mb * Config.BUDGET_RSS_KILL_FACTOR if extractor.rss_budget_mb is not None else None
+    )
+
+    context = process_context(preload=['round1a.supervisor'])
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_child, args=(extractor, file_path, collect_metrics, sender, data),
+                              daemon=True)
+    process.start()
+    sender.close()
+
+    partial = None
+    reason = None
+    try:
+        while True:
+            if receiver.poll(Config.SUPERVISOR_POLL_INTERVAL):
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    process.join()
+                    reason = f"worker exited with code {process.exitcode}"
+                    break
+                if message[0] == 'checkpoint':
+                    partial = message[1]
+                    continue
+                return message[1], message[2]
+
+            reason = hard_limit.exceeded(process.pid)
+            if reason:
+                break
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+
+    print(f"Warning: killed extraction of {file_path}: {reason}")
+    result = partial if partial is not None else {"title": "", "outline": []}
+    result["truncated"] = True
+
+    metrics = None
+    if collect_metrics:
+        killed = PipelineMetrics()
+        killed.documents = 1
+        killed.count('truncated')
+        killed.count('killed')
+        metrics = killed.to_dict()
+    return result, metrics
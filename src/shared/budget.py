@@ -0,0 +1,62 @@
+"""
+Per-document time and memory budgets
+"""
+
+import os
+import resource
+import sys
+import time
+from typing import Optional
+
+
+def current_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    Resident set size of a process (this one by default) in MB, or None when
+    it cannot be read. Uses /proc on Linux; elsewhere only the current
+    process' peak RSS is available.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        if pid is not None:
+            return None
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class DocumentBudget:
+    """
+    Wall-clock and RSS limits for processing one document. A limit of None is
+    not enforced. Call start() when the document is picked up, then check
+    exceeded() at safe stopping points (e.g. page boundaries).
+    """
+
+    def __init__(self, time_limit: Optional[float] = None, max_rss_mb: Optional[float] = None):
+        self.time_limit = time_limit
+        self.max_rss_mb = max_rss_mb
+        self.started = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.time_limit is not None or self.max_rss_mb is not None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def exceeded(self, pid: Optional[int] = None) -> Optional[str]:
+        """Reason the budget is exhausted (for process pid, default this one), or None"""
+        if self.time_limit is not None and self.elapsed() > self.time_limit:
+            return f"time budget of {self.time_limit:g}s exceeded"
+
+        if self.max_rss_mb is not None:
+            rss = current_rss_mb(pid)
+            if rss is not None and rss > self.max_rss_mb:
+                return f"memory budget of {self.max_rss_mb:g} MB exceeded ({rss:.0f} MB)"
+
+        return None
@@ -8,15 +8,33 @@ class Config:
     ROUND1B_MAX_TIME = 60  # seconds for 3-5 documents
     MAX_MODEL_SIZE_1A = 200  # MB
     MAX_MODEL_SIZE_1B = 1000  # MB
+    COLD_START_BUDGET = 1.0  # seconds for start-up imports of src/main.py (no NLP stacks)
     
     # System constraints
     MAX_RAM_USAGE = 16  # GB
     CPU_CORES = 8
     
+    # Per-document budgets (opt-in with --time-budget / --rss-budget)
+    DOCUMENT_TIME_BUDGET = ROUND1A_MAX_TIME  # seconds
+    DOCUMENT_RSS_BUDGET_MB = MAX_RAM_USAGE * 1024 // CPU_CORES  # one worker's share of RAM
+    BUDGET_KILL_GRACE = 2.0  # seconds past the time budget before the worker is killed
+    BUDGET_RSS_KILL_FACTOR = 1.25  # worker is killed at this multiple of the RSS budget
+    BUDGET_CHECKPOINT_INTERVAL = 0.5  # minimum seconds between partial outlines sent to the supervisor
+    BUDGET_CHECKPOINT_MAX_OVERHEAD = 0.05  # share of the time partial outlines may take on long documents
+    SUPERVISOR_POLL_INTERVAL = 0.05  # seconds
+    
     # PDF processing settings
     MAX_PDF_PAGES = 50
     MIN_HEADING_LENGTH = 3
     MAX_HEADING_LENGTH = 200
+    PAGE_PARALLEL_MIN_PAGES = 32  # Smaller PDFs are not worth the process start-up cost
+    FURNITURE_BAND_HEIGHT = 12  # points; vertical band of repeated header/footer lines
+    FURNITURE_MIN_PAGES = 3  # a line repeated on this many pages...
+    FURNITURE_MIN_PAGE_RATIO = 0.5  # ...and on this share of the pages is page furniture
+    SPAN_GAP_RATIO = 0.15  # gap (in font sizes) between runs of a line that counts as a word break
+    LINE_MERGE_MAX_GAP = 0.5  # max gap (in line heights) between wrapped heading lines (--merge-lines)
+    TOC_MIN_VERIFIED_RATIO = 0.8  # share of bookmark titles that must be found on their page
+    TOC_VERIFY_SAMPLE = 25  # bookmark titles checked against the page text per document
     
     # Heading detection thresholds
     FONT_SIZE_THRESHOLD = 0.1  # Relative to average font size
@@ -25,6 +43,9 @@ class Config:
     # NLP model settings
     MAX_SEQUENCE_LENGTH = 512
     BATCH_SIZE = 16
+    SENTENCE_MODEL_NAME = "all-MiniLM-L6-v2"
+    EMBEDDING_CACHE_SIZE = 10000  # embeddings kept in memory (LRU)
+    EMBEDDING_CACHE_DIR = None  # set to a directory to share embeddings on disk
     
     # Relevance scoring weights
     SEMANTIC_WEIGHT = 0.4
@@ -36,6 +57,30 @@ class Config:
     MODELS_DIR = "models"
     TEMP_DIR = "temp"
     
+    # Result cache settings (bump EXTRACTOR_VERSION whenever the extraction
+    # rules change, so outlines cached by older code are not reused)
+    EXTRACTOR_VERSION = "1a-3"
+    CACHE_DIR = "cache"
+    CACHE_MAX_SIZE_MB = 256
+    
+    # Extraction server settings (python src/main.py --serve)
+    SERVER_HOST = "127.0.0.1"
+    SERVER_PORT = 8765
+    SERVER_QUEUE_SIZE = 32  # requests waiting for a worker before new ones get 503
+    SERVER_REQUEST_TIMEOUT = 60  # seconds a request waits for its result
+    
+    # Pipelined batch driver settings (--prefetch)
+    PREFETCH_DEPTH = 4  # upcoming files read into memory ahead of parsing
+    PREFETCH_MAX_MB = 256  # total size of prefetched files; larger files are read from disk
+    PREFETCH_READERS = 2  # reader threads
+    WRITE_QUEUE_SIZE = 16  # outlines waiting for the background writer
+    
+    # JSON Lines output settings (--output-format jsonl)
+    JSONL_PREFIX = "outlines"
+    JSONL_ROTATE_MB = 64  # uncompressed records per part before a new part is started
+    JSONL_BUFFER_SIZE = 1024 * 1024
+    JSONL_GZIP_LEVEL = 6
+    
     # Output format settings
     JSON_INDENT = 2
     ENSURE_ASCII = False
@@ -0,0 +1,111 @@
+"""
+Caches for sentence embeddings
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from shared.config import Config
+
+
+def normalize_cache_text(text: str) -> str:
+    """Whitespace-normalised form of a text used in cache keys"""
+    return ' '.join(text.split())
+
+
+class DiskEmbeddingStore:
+    """
+    On-disk embedding store shared between processes.
+
+    Each vector is one .npy file named by the hash of (model id, text); files
+    are written atomically, so concurrent workers can share the store without
+    locking. Vectors are read fully into memory rather than memory-mapped:
+    a memmap keeps its file descriptor open for as long as the in-memory LRU
+    holds the vector, which would exhaust the process' descriptors.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path_for(self, model_id: str, text: str) -> Path:
+        digest = hashlib.sha1(f"{model_id}\0{text}".encode('utf-8')).hexdigest()
+        model_dir = re.sub(r'[^\w.-]', '_', model_id)
+        return self.store_dir / model_dir / digest[:2] / f"{digest}.npy"
+
+    def get(self, model_id: str, text: str) -> Optional[np.ndarray]:
+        try:
+            return np.load(self._path_for(model_id, text))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, model_id: str, text: str, vector: np.ndarray):
+        path = self._path_for(model_id, text)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.asarray(vector))
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class EmbeddingCache:
+    """
+    Bounded in-memory LRU of embeddings keyed by model id plus normalised
+    text, optionally backed by a DiskEmbeddingStore. Memory hits are free;
+    disk hits are promoted into memory.
+    """
+
+    def __init__(self, max_entries: int = Config.EMBEDDING_CACHE_SIZE,
+                 store_dir: Optional[str] = Config.EMBEDDING_CACHE_DIR):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.store = DiskEmbeddingStore(store_dir) if store_dir else None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_id: str, text: str) -> Optional[np.ndarray]:
+        key = (model_id, normalize_cache_text(text))
+
+        vector = self.entries.get(key)
+        if vector is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+        if self.store is not None:
+            vector = self.store.get(*key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.hits += 1
+                return vector
+
+        self.misses += 1
+        return None
+
+    def put(self, model_id: str, text: str, vector: np.ndarray):
+        key = (model_id, normalize_cache_text(text))
+        self._remember(key, vector)
+        if self.store is not None:
+            self.store.put(*key, vector)
+
+    def clear(self):
+        """Drop the in-memory entries (the disk store is left untouched)"""
+        self.entries.clear()
+
+    def _remember(self, key, vector: np.ndarray):
+        self.entries[key] = vector
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -0,0 +1,161 @@
+"""
+Declarative heading rule tables, compiled once at import
+"""
+
+import re
+from collections import Counter
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+# ---------------------------------------------------------------------------
+# Compiled patterns
+# ---------------------------------------------------------------------------
+
+# "1. Intro" -> h1, "1.1 Scope" -> h2, "1.1.1 Terms" -> h3 in a single match
+NUMBERED_HEADING_RE = re.compile(r'^\d+\.(?:(?P<h1>\s+)|(?P<h2>\d+\s+)|(?P<h3>\d+\.\d+\s+))[A-Z]')
+
+# a) b) c) and 1) 2) 3) list items
+LIST_ITEM_RE = re.compile(r'^(?:\w|\d+)\)\s')
+
+# Common sentence indicators, matched against the lower-cased text in one scan
+SENTENCE_INDICATOR_RE = re.compile(
+    r' (?:is|are|was|were|will|would|should|could|have|has|had|must|may|can|shall'
+    r'|do|does|the|this|that|these|those|a|an) '
+)
+
+CLAUSE_PUNCTUATION_RE = re.compile(r'[.,;:]')
+SENTENCE_PUNCTUATION_RE = re.compile(r'[.,;]')
+
+FRAGMENT_PREFIXES = ('and ', 'or ', 'the ', 'of ', 'in ', 'to ', 'for ', 'with ')
+BULLET_PREFIXES = ('• ', '- ', '* ', '◦ ', '▪ ')
+
+# Fragment endings and incomplete-thought endings, merged into one tuple
+DANGLING_SUFFIXES = (' and', ' or', ' the', ' of', ' in', ' to', ' for', ' with',
+                     ' a', ' an', ' but')
+
+H3_STOP_WORDS = frozenset(['the', 'and', 'for', 'with', 'from'])
+
+MAX_HEADING_WORDS = 12
+MIN_CONFIDENCE = 0.7
+
+
+class BlockFeatures:
+    """Per-block values shared by every rule, computed once per block"""
+
+    __slots__ = ('text', 'words', 'word_count', 'font_size', 'is_bold', 'numbered_level')
+
+    def __init__(self, text: str, words: List[str], font_size: float, is_bold: bool):
+        self.text = text
+        self.words = words
+        self.word_count = len(words)
+        self.font_size = font_size
+        self.is_bold = is_bold
+
+        match = NUMBERED_HEADING_RE.match(text)
+        self.numbered_level = int(match.lastgroup[1]) if match else 0
+
+
+class FontThresholds(NamedTuple):
+    large: float
+    very_large: float
+
+
+class HeadingRule(NamedTuple):
+    """
+    One positive rule. Rules are tried in order; the first rule whose
+    `applies` test passes decides the block: it is a heading if `accepts`
+    also passes, otherwise it is rejected without trying later rules.
+    """
+    name: str
+    level: int
+    confidence: float
+    applies: Callable[[BlockFeatures, FontThresholds], bool]
+    accepts: Callable[[BlockFeatures, FontThresholds], bool] = lambda f, t: True
+
+
+# ---------------------------------------------------------------------------
+# Rule tables
+# ---------------------------------------------------------------------------
+
+# STRICT EXCLUSION RULES - cheapest first; any hit filters the block out
+EXCLUSION_RULES: Tuple[Tuple[str, Callable[[str, List[str]], bool]], ...] = (
+    # Too long for a heading
+    ('too_long', lambda text, words: len(words) > MAX_HEADING_WORDS),
+    # Fragments and lines that end with incomplete thoughts
+    ('fragment', lambda text, words: text.startswith(FRAGMENT_PREFIXES) or text.endswith(DANGLING_SUFFIXES)),
+    # Bullet points and list items
+    ('bullet', lambda text, words: text.startswith(BULLET_PREFIXES) or LIST_ITEM_RE.match(text) is not None),
+    # Sentences (contain common sentence indicators)
+    ('sentence', lambda text, words: SENTENCE_INDICATOR_RE.search(text.lower()) is not None),
+)
+
+# POSITIVE HEADING DETECTION RULES, in priority order
+HEADING_RULES: Tuple[HeadingRule, ...] = (
+    # RULE 1: Numbered section headings (highest confidence)
+    HeadingRule('numbered_h1', 1, 0.95, lambda f, t: f.numbered_level == 1),
+    HeadingRule('numbered_h2', 2, 0.95, lambda f, t: f.numbered_level == 2),
+    HeadingRule('numbered_h3', 3, 0.95, lambda f, t: f.numbered_level == 3),
+
+    # RULE 2: All caps (likely main headings)
+    HeadingRule('all_caps', 1, 0.9,
+                lambda f, t: (f.text.isupper() and 2 <= f.word_count <= 6 and
+                              not CLAUSE_PUNCTUATION_RE.search(f.text))),
+
+    # RULE 3: Large font size (structural headings)
+    HeadingRule('very_large_font', 1, 0.85,
+                lambda f, t: f.font_size >= t.very_large,
+                lambda f, t: 2 <= f.word_count <= 8),
+    HeadingRule('large_font', 2, 0.8,
+                lambda f, t: f.font_size >= t.large,
+                lambda f, t: 2 <= f.word_count <= 8),
+
+    # RULE 4: Bold text with title characteristics
+    HeadingRule('bold_title', 2, 0.75,
+                lambda f, t: (f.is_bold and 2 <= f.word_count <= 6 and
+                              (f.text.istitle() or f.text.endswith(':')) and
+                              not SENTENCE_PUNCTUATION_RE.search(f.text))),
+
+    # RULE 5: Title case with colon (section labels)
+    HeadingRule('title_colon', 2, 0.8,
+                lambda f, t: f.text.endswith(':') and f.text.istitle() and 2 <= f.word_count <= 4),
+
+    # RULE 6: Short title case phrases (subsection headings)
+    HeadingRule('short_title', 3, 0.7,
+                lambda f, t: (f.text.istitle() and 2 <= f.word_count <= 5 and
+                              not f.text.endswith(('.', ',', ';')) and
+                              all(word[0].isupper() for word in f.words if word.isalpha())),
+                # Additional validation for H3
+                lambda f, t: not any(word.lower() in H3_STOP_WORDS for word in f.words)),
+)
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+def is_excluded(text: str, words: List[str], rule_hits: Optional[Counter] = None) -> bool:
+    """Apply the exclusion table; records the rule that fired in rule_hits"""
+    for name, rule in EXCLUSION_RULES:
+        if rule(text, words):
+            if rule_hits is not None:
+                rule_hits['exclude:' + name] += 1
+            return True
+    return False
+
+
+def classify(features: BlockFeatures, thresholds: FontThresholds,
+             rule_hits: Optional[Counter] = None) -> Tuple[Optional[int], float]:
+    """
+    Run the positive rule table over one block in a single pass and return
+    (level, confidence), or (None, 0) if no rule accepts it.
+    """
+    for rule in HEADING_RULES:
+        if rule.applies(features, thresholds):
+            if rule.accepts(features, thresholds) and rule.confidence >= MIN_CONFIDENCE:
+                if rule_hits is not None:
+                    rule_hits['heading:' + rule.name] += 1
+                return rule.level, rule.confidence
+            if rule_hits is not None:
+                rule_hits['reject:' + rule.name] += 1
+            return None, 0
+    return None, 0
@@ -0,0 +1,96 @@
+"""
+Output manifest used by incremental batch runs
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from shared.config import Config
+
+
+class OutputManifest:
+    """
+    Records which outputs were produced from which inputs.
+
+    The manifest is an append-only JSON Lines file in the output directory, so
+    every completed file is durable as soon as it is recorded and a crashed
+    batch can resume where it stopped. The last record for a file wins;
+    compact() rewrites the file with one record per input.
+    """
+
+    FILENAME = ".round1a_manifest.jsonl"
+
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / self.FILENAME
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        entries = {}
+        if not self.path.exists():
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    entries[record['file']] = record
+                except (ValueError, KeyError):
+                    # A torn last line from an interrupted run
+                    continue
+
+        return entries
+
+    def is_up_to_date(self, file_path: Path, output_file: Optional[Path], variant: str = "") -> bool:
+        """
+        True if output_file is the output last recorded for file_path and was
+        produced from its current version with the same extractor options
+        (see OutlineExtractor.output_variant)
+        """
+        record = self.entries.get(str(file_path.name))
+        if not record or record.get('status') != 'ok':
+            return False
+        if record.get('extractor_version') != Config.EXTRACTOR_VERSION:
+            return False
+        if record.get('variant', '') != variant:
+            return False
+        if output_file is None or record.get('output') != output_file.name or not output_file.exists():
+            return False
+
+        stat = file_path.stat()
+        return record.get('size') == stat.st_size and record.get('mtime_ns') == stat.st_mtime_ns
+
+    def recorded_output(self, file_path: Path) -> Optional[str]:
+        """Name of the output last recorded for file_path, if any"""
+        record = self.entries.get(str(file_path.name))
+        return record.get('output') if record else None
+
+    def record(self, file_path: Path, output_file: Path, status: str, variant: str = ""):
+        """Append the result for one input and flush it to disk"""
+        stat = file_path.stat()
+        record = {
+            'file': file_path.name,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'output': output_file.name,
+            'status': status,
+            'extractor_version': Config.EXTRACTOR_VERSION,
+            'variant': variant,
+            'produced_at': time.time()
+        }
+        self.entries[record['file']] = record
+
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self):
+        """Rewrite the manifest with only the latest record per input"""
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for name in sorted(self.entries):
+                f.write(json.dumps(self.entries[name], ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,95 @@
+"""
+Per-stage timing and counters for the Round 1A pipeline
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+
+class PipelineMetrics:
+    """
+    Wall/CPU time per pipeline stage plus counters (pages, spans, candidates,
+    headings, ...) and heading-rule hit counts.
+
+    One instance can cover a single document or be merged across a batch.
+    Instances round-trip through plain dicts so pool workers can send them
+    back to the parent process. A disabled instance makes every hook a no-op,
+    so instrumented code does not need to check whether metrics are wanted.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.documents = 0
+        self.stages = {}  # name -> {'wall': s, 'cpu': s, 'calls': n}
+        self.counters = Counter()
+        self.rule_hits = Counter()
+
+    def stage(self, name: str):
+        """Context manager that adds the wall and CPU time of its body to `name`"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            totals['wall'] += time.perf_counter() - wall
+            totals['cpu'] += time.process_time() - cpu
+            totals['calls'] += 1
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def merge(self, other: 'PipelineMetrics'):
+        """Add another run's metrics into this one"""
+        self.documents += other.documents
+        for name, totals in other.stages.items():
+            mine = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            for key in ('wall', 'cpu', 'calls'):
+                mine[key] += totals[key]
+        self.counters.update(other.counters)
+        self.rule_hits.update(other.rule_hits)
+
+    def to_dict(self) -> Dict:
+        return {
+            'documents': self.documents,
+            'stages': self.stages,
+            'counters': dict(self.counters),
+            'rule_hits': dict(self.rule_hits)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PipelineMetrics':
+        metrics = cls()
+        metrics.documents = data.get('documents', 0)
+        metrics.stages = {name: dict(totals) for name, totals in data.get('stages', {}).items()}
+        metrics.counters.update(data.get('counters', {}))
+        metrics.rule_hits.update(data.get('rule_hits', {}))
+        return metrics
+
+    def format_summary(self) -> List[str]:
+        """Printable lines: stages by descending wall time, then counters and rule hits"""
+        lines = [f"Pipeline metrics ({self.documents} documents)"]
+        total_wall = sum(totals['wall'] for totals in self.stages.values()) or 1.0
+
+        for name, totals in sorted(self.stages.items(), key=lambda item: -item[1]['wall']):
+            lines.append(f"  {name:<18} wall {totals['wall']:8.3f}s ({totals['wall'] / total_wall:5.1%})"
+                         f"  cpu {totals['cpu']:8.3f}s  calls {totals['calls']}")
+
+        if self.counters:
+            lines.append("  " + ", ".join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+        for name, value in self.rule_hits.most_common():
+            lines.append(f"    {name:<28} {value}")
+
+        return lines
+
+
+# Shared disabled instance for callers that do not collect metrics
+NULL_METRICS = PipelineMetrics(enabled=False)
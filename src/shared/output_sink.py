@@ -0,0 +1,119 @@
+"""
+Bulk JSON Lines output for batch runs (--output-format jsonl)
+"""
+
+import gzip
+import io
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from shared.config import Config
+
+
+class JsonLinesSink:
+    """
+    Appends one compact JSON record per document to rotating JSON Lines parts
+    (<prefix>-00000.jsonl, or .jsonl.gz when compressed) in the output
+    directory, instead of one pretty-printed file per input.
+
+    Records are written through a buffered writer into <part>.partial. Once a
+    part holds max_mb of (uncompressed) records, or the sink is closed, it is
+    flushed to disk and atomically renamed to its final name, so readers only
+    ever see complete parts. Part numbers continue after those already in the
+    directory; a .partial left by an interrupted run is never renamed and its
+    number is not reused. write() may be called from several threads.
+    """
+
+    PARTIAL_SUFFIX = ".partial"
+
+    def __init__(self, output_dir: Path, max_mb: float = Config.JSONL_ROTATE_MB,
+                 compress: bool = False, prefix: str = Config.JSONL_PREFIX):
+        self.output_dir = Path(output_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.compress = compress
+        self.prefix = prefix
+        self.part_re = re.compile(rf'^{re.escape(prefix)}-(\d+)\.jsonl(\.gz)?$')
+        self.parts: List[Path] = []  # committed by this sink, in order
+
+        self._lock = threading.Lock()
+        self._next_number = self._first_free_number()
+        self._path: Optional[Path] = None
+        self._raw = None
+        self._stream = None
+        self._bytes = 0
+
+    def _first_free_number(self) -> int:
+        numbers = [-1]
+        for entry in self.output_dir.glob(f"{self.prefix}-*"):
+            name = entry.name
+            if name.endswith(self.PARTIAL_SUFFIX):
+                name = name[:-len(self.PARTIAL_SUFFIX)]
+            match = self.part_re.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return max(numbers) + 1
+
+    def is_part(self, name: str) -> bool:
+        """True if name is a (committed) part written by a sink with this prefix"""
+        return bool(self.part_re.match(name))
+
+    def write(self, record: Dict) -> Path:
+        """Append record; returns the final path of the part it belongs to"""
+        line = (json.dumps(record, ensure_ascii=Config.ENSURE_ASCII, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._lock:
+            if self._stream is None:
+                self._open_part()
+            path = self._path
+            self._stream.write(line)
+            self._bytes += len(line)
+            if self._bytes >= self.max_bytes:
+                self._commit_part()
+        return path
+
+    def close(self):
+        """Commit the current part (if any records were written to it)"""
+        with self._lock:
+            if self._stream is not None:
+                self._commit_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open_part(self):
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        self._path = self.output_dir / f"{self.prefix}-{self._next_number:05d}{suffix}"
+        self._next_number += 1
+
+        self._raw = open(self._partial_path(), 'wb', buffering=0)
+        if self.compress:
+            gzip_file = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=Config.JSONL_GZIP_LEVEL)
+            self._stream = io.BufferedWriter(gzip_file, buffer_size=Config.JSONL_BUFFER_SIZE)
+        else:
+            self._stream = io.BufferedWriter(self._raw, buffer_size=Config.JSONL_BUFFER_SIZE)
+        self._bytes = 0
+
+    def _commit_part(self):
+        """Flush the current part to disk and rename it to its final name"""
+        if self.compress:
+            # Writes the gzip trailer; the raw file stays open
+            self._stream.close()
+        else:
+            self._stream.flush()
+        os.fsync(self._raw.fileno())
+        self._stream.close()
+        self._raw.close()
+
+        os.replace(self._partial_path(), self._path)
+        self.parts.append(self._path)
+        self._stream = self._raw = None
+
+    def _partial_path(self) -> Path:
+        return self._path.with_name(self._path.name + self.PARTIAL_SUFFIX)
@@ -11,88 +11,384 @@ except ImportError:
     PYMUPDF_AVAILABLE = False
 
 import re
-import statistics
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterator, Tuple, Optional
 from dataclasses import dataclass
 
+from shared.config import Config
+from shared.heading_rules import MAX_HEADING_WORDS, NUMBERED_HEADING_RE
+from shared.metrics import PipelineMetrics, NULL_METRICS
+from shared.processes import process_context
+
 # Import our text fallback
-from shared.text_utils import extract_document_structure as extract_text_structure, TextBlock
+from shared.text_utils import (
+    extract_document_structure as extract_text_structure, extract_text_from_file,
+    get_text_statistics, Document, TextBlock
+)
+
+# "3", "1-5" or the open-ended "20-"
+PAGE_RANGE_RE = re.compile(r'^(\d+)(-(\d*))?$')
 
 
-def extract_document_content(file_path: str) -> Dict:
+def parse_page_ranges(page_spec: str) -> List[Tuple[int, int]]:
     """
-    Extract content from PDF or text file
+    Parse a 1-based, inclusive page range list such as "1-5,8,20-" into
+    (first, last) tuples; last is None for an open-ended range.
+    Raises ValueError on malformed input.
+    """
+    ranges = []
+    for part in page_spec.split(','):
+        part = part.strip()
+        match = PAGE_RANGE_RE.match(part)
+        if not match:
+            raise ValueError(f"invalid page range '{part}' (expected e.g. 1-5,8)")
+
+        first = int(match.group(1))
+        if match.group(2) is None:
+            last = first
+        else:
+            last = int(match.group(3)) if match.group(3) else None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"invalid page range '{part}'")
+        ranges.append((first, last))
+
+    return ranges
+
+
+def open_pdf(file_path: str, data: Optional[bytes] = None):
+    """
+    Open a PDF with PyMuPDF, from data (the file's bytes, already read into
+    memory) when given and from file_path otherwise.
+    """
+    if data is not None:
+        return fitz.open(stream=data, filetype="pdf")
+    return fitz.open(file_path)
+
+
+def select_pages(doc, page_spec: Optional[str] = None, max_pages: Optional[int] = None) -> List[int]:
+    """
+    Resolve a page selection against an open document into sorted 0-based
+    page numbers. page_spec is a range list (see parse_page_ranges), or
+    "outline" for the pages the PDF's own bookmarks point at (every page when
+    it has none). max_pages keeps only the first N selected pages.
+    """
+    page_count = len(doc)
+
+    if not page_spec:
+        pages = range(page_count)
+    elif page_spec == 'outline':
+        toc_pages = {entry[2] - 1 for entry in doc.get_toc(simple=True) if 1 <= entry[2] <= page_count}
+        pages = sorted(toc_pages) if toc_pages else range(page_count)
+    else:
+        selected = set()
+        for first, last in parse_page_ranges(page_spec):
+            last = page_count if last is None else min(last, page_count)
+            selected.update(range(first - 1, last))
+        pages = sorted(selected)
+
+    pages = list(pages)
+    if max_pages is not None:
+        pages = pages[:max_pages]
+    return pages
+
+
+def extract_toc_headings(file_path: str, page_spec: Optional[str] = None,
+                         max_pages: Optional[int] = None,
+                         metrics: PipelineMetrics = NULL_METRICS,
+                         data: Optional[bytes] = None) -> Optional[List[Dict]]:
+    """
+    Read the PDF's embedded table of contents (bookmarks) as headings
+    ({'text', 'level', 'page_num'}, in bookmark order), restricted to the
+    selected pages.
+
+    The bookmarks are only trusted if at least Config.TOC_MIN_VERIFIED_RATIO
+    of a sample of up to Config.TOC_VERIFY_SAMPLE titles actually appear on
+    the page they point at; only those pages' plain text is read for the check. Returns None when the document
+    has no usable bookmarks, so the caller can fall back to full analysis.
+    """
+    if not PYMUPDF_AVAILABLE or not file_path.lower().endswith('.pdf'):
+        return None
+
+    with open_pdf(file_path, data) as doc:
+        selected = set(select_pages(doc, page_spec, max_pages))
+        entries = [(level, clean_text(title), page - 1)
+                   for level, title, page in doc.get_toc(simple=True)
+                   if page - 1 in selected and clean_text(title)]
+        if not entries:
+            return None
+
+        # Check an evenly spread sample so long TOCs do not cost a pass over the text
+        sample = entries[::-(-len(entries) // Config.TOC_VERIFY_SAMPLE)]
+        page_texts = {}
+        verified = 0
+        for _, title, page_num in sample:
+            if page_num not in page_texts:
+                page_texts[page_num] = clean_text(doc.load_page(page_num).get_text("text")).casefold()
+            if title.casefold() in page_texts[page_num]:
+                verified += 1
+
+    metrics.count('toc_pages_checked', len(page_texts))
+    if verified < Config.TOC_MIN_VERIFIED_RATIO * len(sample):
+        return None
+
+    return [{'text': title, 'level': level, 'page_num': page_num + 1}
+            for level, title, page_num in entries]
+
+
+def extract_document_content(file_path: str, page_workers: int = 1,
+                             metrics: PipelineMetrics = NULL_METRICS,
+                             page_spec: Optional[str] = None, max_pages: Optional[int] = None,
+                             merge_lines: bool = False, data: Optional[bytes] = None) -> Document:
+    """
+    Extract content from PDF or text file as a Document. page_spec and max_pages restrict
+    which PDF pages are parsed (see select_pages); merge_lines joins wrapped
+    heading lines (see _convert_blocks). data, if given, is the file's content
+    already read into memory and is parsed instead of reading file_path.
     """
     file_path_lower = file_path.lower()
     
     if file_path_lower.endswith('.txt'):
         # Handle text files
-        return extract_text_structure(file_path)
+        with metrics.stage('text_parse'):
+            return extract_text_structure(file_path, data)
     elif file_path_lower.endswith('.pdf') and PYMUPDF_AVAILABLE:
         # Handle PDF files with PyMuPDF
-        return extract_pdf_content(file_path)
+        return extract_pdf_content(file_path, page_workers=page_workers, metrics=metrics,
+                                   page_spec=page_spec, max_pages=max_pages, merge_lines=merge_lines,
+                                   data=data)
     elif file_path_lower.endswith('.pdf') and not PYMUPDF_AVAILABLE:
         # PDF requested but PyMuPDF not available
         print(f"Warning: PyMuPDF not available for PDF {file_path}. Please install PyMuPDF or provide a text file.")
-        return {'text_blocks': [], 'headings': [], 'statistics': {'total_blocks': 0, 'avg_font_size': 12.0, 'font_sizes': [12.0]}}
+        return Document([], file_path)
+    else:
+        print(f"Unsupported file type: {file_path}")
+        return Document([], file_path)
+
+
+def iter_document_pages(file_path: str, metrics: PipelineMetrics = NULL_METRICS,
+                        page_spec: Optional[str] = None, max_pages: Optional[int] = None,
+                        merge_lines: bool = False,
+                        data: Optional[bytes] = None) -> Iterator[Tuple[int, List[TextBlock]]]:
+    """
+    Yield (page_num, text_blocks) one page at a time so callers can process
+    documents without materialising every TextBlock. Text files are a single
+    page; for PDFs only the pages chosen by select_pages are read. data, if
+    given, is the file's content already in memory (see extract_document_content).
+    """
+    file_path_lower = file_path.lower()
+
+    if file_path_lower.endswith('.txt'):
+        with metrics.stage('text_parse'):
+            text_blocks = extract_text_from_file(file_path, data)
+        yield 1, text_blocks
+    elif file_path_lower.endswith('.pdf') and PYMUPDF_AVAILABLE:
+        with open_pdf(file_path, data) as doc:
+            for page_num in select_pages(doc, page_spec, max_pages):
+                page = doc.load_page(page_num)
+                yield page_num + 1, _extract_page_blocks(page, page_num, metrics, merge_lines)
+    elif file_path_lower.endswith('.pdf'):
+        print(f"Warning: PyMuPDF not available for PDF {file_path}. Please install PyMuPDF or provide a text file.")
     else:
         print(f"Unsupported file type: {file_path}")
-        return {'text_blocks': [], 'headings': [], 'statistics': {'total_blocks': 0, 'avg_font_size': 12.0, 'font_sizes': [12.0]}}
 
 
-def extract_pdf_content(file_path: str) -> Dict:
+def extract_pdf_content(file_path: str, page_workers: int = 1,
+                        metrics: PipelineMetrics = NULL_METRICS,
+                        page_spec: Optional[str] = None, max_pages: Optional[int] = None,
+                        merge_lines: bool = False, data: Optional[bytes] = None) -> Document:
     """
     Extract rich content from a PDF file using PyMuPDF, including text,
     font size, font weight, and layout information.
+
+    Only the pages chosen by page_spec / max_pages (see select_pages) are
+    parsed; the rest of the document is never touched. With page_workers > 1,
+    large selections are split into contiguous chunks that are parsed in
+    separate processes (each reopening the file) and merged back in page order.
+    With data (the file's bytes already in memory), the serial path parses it
+    instead of reading file_path; page workers still reopen the file, which is
+    cheaper than pickling the whole document to every process.
     """
     if not PYMUPDF_AVAILABLE:
         raise ImportError("PyMuPDF not available")
     
-    doc = fitz.open(file_path)
-    text_blocks = []
+    with open_pdf(file_path, data) as doc:
+        pages = select_pages(doc, page_spec, max_pages)
+
+    if page_workers > 1 and len(pages) >= Config.PAGE_PARALLEL_MIN_PAGES:
+        # Per-page timings are not collected across processes
+        with metrics.stage('pdf_parse_parallel'):
+            text_blocks = _extract_pages_parallel(file_path, pages, page_workers, merge_lines)
+        metrics.count('pages', len(pages))
+        metrics.count('lines', len(text_blocks))
+    else:
+        text_blocks = _extract_pages(file_path, pages, metrics, merge_lines, data)
     
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        
-        # Extract blocks with detailed information
+    # Font histogram, headings and statistics are derived lazily by Document
+    return Document(text_blocks, file_path)
+
+
+def _extract_pages_parallel(file_path: str, pages: List[int], page_workers: int,
+                            merge_lines: bool = False) -> List[TextBlock]:
+    """
+    Parse contiguous chunks of the selected pages in worker processes and
+    merge them in page order.
+    """
+    page_workers = min(page_workers, len(pages))
+    chunk_size = -(-len(pages) // page_workers)  # ceiling division
+    chunks = [pages[start:start + chunk_size] for start in range(0, len(pages), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=len(chunks),
+                             mp_context=process_context(preload=['shared.pdf_utils'])) as pool:
+        # map() preserves submission order, so chunks come back in page order
+        text_blocks = []
+        for chunk in pool.map(_extract_pages, [file_path] * len(chunks), chunks,
+                              [NULL_METRICS] * len(chunks), [merge_lines] * len(chunks)):
+            text_blocks.extend(chunk)
+
+    return text_blocks
+
+
+def _extract_pages(file_path: str, pages: List[int], metrics: PipelineMetrics = NULL_METRICS,
+                   merge_lines: bool = False, data: Optional[bytes] = None) -> List[TextBlock]:
+    """
+    Extract the text blocks of the given (0-based) pages from a PDF file.
+    """
+    text_blocks = []
+
+    with open_pdf(file_path, data) as doc:
+        for page_num in pages:
+            page = doc.load_page(page_num)
+            text_blocks.extend(_extract_page_blocks(page, page_num, metrics, merge_lines))
+
+    return text_blocks
+
+
+def _extract_page_blocks(page, page_num: int, metrics: PipelineMetrics = NULL_METRICS,
+                         merge_lines: bool = False) -> List[TextBlock]:
+    """
+    Convert the spans of one PyMuPDF page into line-level TextBlocks.
+    """
+    text_blocks = []
+
+    # Extract blocks with detailed information
+    with metrics.stage('pdf_parse'):
         blocks = page.get_text("dict", flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_LIGATURES & ~fitz.TEXT_PRESERVE_IMAGES)["blocks"]
-        
-        for block in blocks:
-            if block['type'] == 0:  # It's a text block
-                for line in block['lines']:
-                    for span in line['spans']:
-                        text = clean_text(span['text'])
-                        if text:
-                            # Enhanced bold detection
-                            font_name = span['font'].lower()
-                            is_bold = ("bold" in font_name or 
-                                     "black" in font_name or 
-                                     span['flags'] & 2**4 or  # Bold flag
-                                     span['flags'] & 16)      # Bold flag alternative
-                            
-                            text_block = TextBlock(
-                                text=text,
-                                page_num=page_num + 1,
-                                bbox=span['bbox'],
-                                font_size=round(span['size']),
-                                font_name=span['font'],
-                                font_flags=span['flags'],
-                                line_height=line['bbox'][3] - line['bbox'][1],
-                                is_bold=is_bold
-                            )
-                            text_blocks.append(text_block)
-                            
-    doc.close()
-    
-    # This part can be simplified as heading detection will be more sophisticated
-    headings = [] 
-    statistics = get_text_statistics(text_blocks)
-    
-    return {
-        'text_blocks': text_blocks,
-        'headings': headings,
-        'statistics': statistics
-    }
+
+    with metrics.stage('span_conversion'):
+        span_count = _convert_blocks(blocks, page_num, text_blocks, merge_lines)
+
+    metrics.count('pages')
+    metrics.count('spans', span_count)
+    metrics.count('lines', len(text_blocks))
+    return text_blocks
+
+
+def _convert_blocks(blocks: List[Dict], page_num: int, text_blocks: List[TextBlock],
+                    merge_lines: bool = False) -> int:
+    """
+    Append one TextBlock per text line of PyMuPDF's block dicts, merging the
+    line's spans (font runs such as "1." + "Introduction") so each line goes
+    through the heading rules once. With merge_lines, consecutive lines of a
+    block in the same style are also joined while they are short enough to be
+    one heading wrapped over several lines. Returns the number of spans read.
+    """
+    span_count = 0
+
+    for block in blocks:
+        if block['type'] != 0:  # Not a text block
+            continue
+
+        previous = None
+        for line in block['lines']:
+            span_count += len(line['spans'])
+            text_block = _line_to_block(line, page_num)
+            if text_block is None:
+                continue
+
+            if merge_lines and previous is not None and _continues_line(previous, text_block):
+                previous.text = f"{previous.text} {text_block.text}"
+                previous.bbox = (min(previous.x0, text_block.x0), previous.y0,
+                                 max(previous.x1, text_block.x1), text_block.y1)
+                continue
+
+            text_blocks.append(text_block)
+            previous = text_block
+
+    return span_count
+
+
+def _span_is_bold(span: Dict) -> bool:
+    # Enhanced bold detection: font name or the bold flag
+    font_name = span['font'].lower()
+    return "bold" in font_name or "black" in font_name or bool(span['flags'] & 16)
+
+
+def _line_to_block(line: Dict, page_num: int) -> Optional[TextBlock]:
+    """
+    Merge the spans of one PyMuPDF line into a TextBlock. Font attributes come
+    from the span with the most characters; the line is bold if most of its
+    characters are. None for lines without visible text.
+    """
+    parts = []
+    dominant = None
+    dominant_chars = bold_chars = chars = 0
+    x0 = y0 = float('inf')
+    x1 = y1 = float('-inf')
+    previous_x1 = None
+
+    for span in line['spans']:
+        raw = span['text']
+        visible = len(raw.strip())
+        if not visible:
+            parts.append(raw)
+            continue
+
+        # Runs placed apart without a space character still are separate words
+        if (previous_x1 is not None and not raw[0].isspace() and not parts[-1][-1:].isspace()
+                and span['bbox'][0] - previous_x1 > Config.SPAN_GAP_RATIO * span['size']):
+            parts.append(' ')
+        parts.append(raw)
+        previous_x1 = span['bbox'][2]
+
+        chars += visible
+        if _span_is_bold(span):
+            bold_chars += visible
+        if visible > dominant_chars:
+            dominant, dominant_chars = span, visible
+
+        sx0, sy0, sx1, sy1 = span['bbox']
+        x0, y0, x1, y1 = min(x0, sx0), min(y0, sy0), max(x1, sx1), max(y1, sy1)
+
+    if dominant is None:
+        return None
+    text = clean_text(''.join(parts))
+    if not text:
+        return None
+
+    return TextBlock(
+        text=text,
+        page_num=page_num + 1,
+        bbox=(x0, y0, x1, y1),
+        font_size=round(dominant['size']),
+        font_name=dominant['font'],
+        font_flags=dominant['flags'],
+        line_height=line['bbox'][3] - line['bbox'][1],
+        is_bold=bold_chars * 2 >= chars
+    )
+
+
+def _continues_line(previous: TextBlock, current: TextBlock) -> bool:
+    """True if current looks like the wrapped continuation of previous"""
+    return (current.font_size == previous.font_size and
+            current.is_bold == previous.is_bold and
+            current.font_name == previous.font_name and
+            0 <= current.y0 - previous.y1 <= previous.line_height * Config.LINE_MERGE_MAX_GAP and
+            # Left-aligned or centred under the previous line
+            (abs(current.x0 - previous.x0) <= previous.font_size or
+             abs((current.x0 + current.x1) - (previous.x0 + previous.x1)) <= 2 * previous.font_size) and
+            not previous.text.endswith(('.', ':', ';')) and
+            NUMBERED_HEADING_RE.match(current.text) is None and
+            len(previous.text.split()) + len(current.text.split()) <= MAX_HEADING_WORDS)
 
 
 def clean_text(text: str) -> str:
@@ -108,32 +404,6 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
-def get_text_statistics(text_blocks: List[TextBlock]) -> Dict:
-    """
-    Calculate statistics about the text blocks.
-    """
-    if not text_blocks:
-        return {
-            'total_blocks': 0,
-            'avg_font_size': 12.0,
-            'font_sizes': [12.0]
-        }
-    
-    font_sizes = [block.font_size for block in text_blocks if block.font_size]
-    if not font_sizes:
-        return {
-            'total_blocks': len(text_blocks),
-            'avg_font_size': 12.0,
-            'font_sizes': [12.0]
-        }
-
-    return {
-        'total_blocks': len(text_blocks),
-        'avg_font_size': statistics.mean(font_sizes),
-        'font_sizes': font_sizes
-    }
-
-
 def is_likely_heading(text: str) -> bool:
     """
     Check if a given text string is likely to be a heading.
@@ -174,8 +444,7 @@ class PDFUtils:
     def extract_text_blocks(pdf_path: str) -> List[TextBlock]:
         """Extract text blocks with formatting information from PDF"""
         # Use our fallback system
-        doc_content = extract_document_content(pdf_path)
-        return doc_content.get('text_blocks', [])
+        return extract_document_content(pdf_path).text_blocks
     
     @staticmethod
     def clean_text(text: str) -> str:
@@ -0,0 +1,29 @@
+"""
+Choosing how to start child processes
+"""
+
+import multiprocessing
+import threading
+from typing import Sequence
+
+
+def process_context(preload: Sequence[str] = ()):
+    """
+    Multiprocessing context for starting children from the current process.
+
+    fork is used while this process is single-threaded: children share what
+    is already built without pickling or re-importing it. A child forked from
+    a threaded process (e.g. the pipelined batch driver) can inherit a lock
+    another thread holds, such as stdout's, and hang on it, so otherwise the
+    forkserver (preloading the given modules) or spawn method is used.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and threading.active_count() == 1:
+        return multiprocessing.get_context('fork')
+
+    if 'forkserver' in methods:
+        context = multiprocessing.get_context('forkserver')
+        if preload:
+            context.set_forkserver_preload(list(preload))
+        return context
+    return multiprocessing.get_context('spawn')
@@ -0,0 +1,120 @@
+"""
+Persistent on-disk cache of extracted outlines
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from shared.config import Config
+
+
+class ResultCache:
+    """
+    Content-addressed store of {"title", "outline"} results.
+
+    Entries are keyed by the SHA-256 of the document bytes plus the extractor
+    version, so a changed file or a rule change never returns a stale outline.
+    Each entry is one JSON file; reads refresh the file's mtime, and when the
+    cache grows beyond max_size_mb the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str = Config.CACHE_DIR, max_size_mb: float = Config.CACHE_MAX_SIZE_MB):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size_bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    def key_for(self, file_path: str, variant: str = "", data: Optional[bytes] = None) -> str:
+        """
+        Build the cache key for a document (and extractor options variant);
+        data, if given, is the document's content already read into memory.
+        """
+        digest = hashlib.sha256()
+        if data is not None:
+            digest.update(data)
+        else:
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+
+        digest.update(f"|{Config.EXTRACTOR_VERSION}|{variant}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None on a miss"""
+        entry = self._path_for(key)
+        try:
+            with open(entry, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key: str, result: Dict):
+        """Store a result, evicting least recently used entries if needed"""
+        entry = self._path_for(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write atomically so concurrent workers never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=entry.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, entry)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._size_bytes += entry.stat().st_size
+        if self._size_bytes > self.max_size_bytes:
+            self._evict()
+
+    def clear(self):
+        """Remove every cached entry"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size_bytes = 0
+
+    def _path_for(self, key: str) -> Path:
+        # Two-character fan-out keeps directories small for large corpora
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _entries(self):
+        return self.cache_dir.glob("*/*.json")
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is 90% of its limit"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_size_bytes * 0.9)
+
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                pass
+
+        self._size_bytes = total
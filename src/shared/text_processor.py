@@ -4,33 +4,56 @@ Text processing utilities for NLP tasks
 
 import re
 import string
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 from collections import Counter
 
-# Try to import spaCy, but gracefully handle if not available
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-except ImportError:
-    SPACY_AVAILABLE = False
-    print("Warning: spaCy not available. Using basic text processing.")
-
-# Try to import transformers for advanced ML capabilities
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModel
-    import torch
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    print("Warning: Transformers not available. Using basic text processing.")
-
-# Try to import sentence-transformers for semantic similarity
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-    print("Warning: Sentence-transformers not available. Using basic similarity.")
+import numpy as np
+
+from shared.config import Config
+from shared.embedding_cache import EmbeddingCache
+
+# Heavyweight NLP stacks (spaCy, transformers/torch, sentence-transformers) are
+# optional and slow to import, so they are imported on first use rather than
+# when this module is imported. Each importer caches its result and prints its
+# fallback warning at most once.
+_optional_imports = {}
+
+
+def _optional_import(key: str, importer, warning: str):
+    """Run importer() once; return its result, or None if the import fails"""
+    if key not in _optional_imports:
+        try:
+            _optional_imports[key] = importer()
+        except ImportError:
+            _optional_imports[key] = None
+            print(warning)
+    return _optional_imports[key]
+
+
+def _import_spacy():
+    def importer():
+        import spacy
+        return spacy
+    return _optional_import('spacy', importer, "Warning: spaCy not available. Using basic text processing.")
+
+
+def _import_transformers_pipeline():
+    def importer():
+        from transformers import pipeline
+        import torch  # noqa: F401 - the pipeline needs a backend
+        return pipeline
+    return _optional_import('transformers', importer, "Warning: Transformers not available. Using basic text processing.")
+
+
+def _import_sentence_transformer():
+    def importer():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer
+    return _optional_import('sentence_transformers', importer, "Warning: Sentence-transformers not available. Using basic similarity.")
+
+
+# Sentinel for models that have not been loaded yet (None means unavailable)
+_NOT_LOADED = object()
 
 
 class TextProcessor:
@@ -78,51 +101,106 @@ class TextProcessor:
         return cls._instance
     
     def __init__(self):
-        """Initialize with ML models if available - only once"""
+        """
+        Initialize the singleton - only once. Models are not loaded here: each
+        one is loaded lazily by the first method that needs it (see the nlp,
+        classifier and sentence_model properties), or up front via warmup().
+        """
         if TextProcessor._initialized:
             return
             
-        print("Initializing TextProcessor with ML models...")
         TextProcessor._initialized = True
         
-        self.nlp = None
-        self.classifier = None
-        self.sentence_model = None
-        
-        # Initialize spaCy
-        if SPACY_AVAILABLE:
+        self._nlp = _NOT_LOADED
+        self._classifier = _NOT_LOADED
+        self._sentence_model = _NOT_LOADED
+
+        # Repeated texts ("Introduction", ...) are only ever encoded once
+        self.embedding_cache = EmbeddingCache()
+
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first use (None if unavailable)"""
+        if self._nlp is _NOT_LOADED:
+            self._nlp = self._load_spacy_model()
+        return self._nlp
+
+    @property
+    def classifier(self):
+        """Transformers text classifier, loaded on first use (None if unavailable)"""
+        if self._classifier is _NOT_LOADED:
+            self._classifier = self._load_classifier()
+        return self._classifier
+
+    @property
+    def sentence_model(self):
+        """Sentence transformer, loaded on first use (None if unavailable)"""
+        if self._sentence_model is _NOT_LOADED:
+            self._sentence_model = self._load_sentence_model()
+        return self._sentence_model
+
+    def warmup(self, nlp: bool = True, classifier: bool = True, sentence_model: bool = True):
+        """Load the requested models now, for servers that prefer to pay the cost up front"""
+        print("Warming up TextProcessor ML models...")
+        if nlp:
+            self.nlp
+        if classifier:
+            self.classifier
+        if sentence_model:
+            self.sentence_model
+        print("TextProcessor warmup complete")
+
+    def _load_spacy_model(self):
+        spacy = _import_spacy()
+        if spacy is None:
+            return None
+
+        try:
+            print("Loading spaCy model...")
+            nlp = spacy.load("en_core_web_sm")
+            print("✓ spaCy model loaded")
+            return nlp
+        except OSError:
             try:
-                print("Loading spaCy model...")
-                self.nlp = spacy.load("en_core_web_sm")
-                print("✓ spaCy model loaded")
+                nlp = spacy.load("en_core_web_md")
+                print("✓ spaCy model loaded (md)")
+                return nlp
             except OSError:
-                try:
-                    self.nlp = spacy.load("en_core_web_md")
-                    print("✓ spaCy model loaded (md)")
-                except OSError:
-                    print("Warning: spaCy model not found. Using basic text processing.")
-        
-        # Initialize transformers classifier for heading detection
-        if TRANSFORMERS_AVAILABLE:
-            try:
-                print("Loading transformer model...")
-                self.classifier = pipeline("text-classification", 
-                                         model="distilbert-base-uncased-finetuned-sst-2-english",
-                                         top_k=None)  # Fix the deprecated warning
-                print("✓ Transformer model loaded")
-            except Exception as e:
-                print(f"Warning: Could not load transformer classifier: {e}")
-        
-        # Initialize sentence transformer for semantic similarity
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
-            try:
-                print("Loading sentence transformer...")
-                self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-                print("✓ Sentence transformer loaded")
-            except Exception as e:
-                print(f"Warning: Could not load sentence transformer: {e}")
-                
-        print("TextProcessor initialization complete")
+                print("Warning: spaCy model not found. Using basic text processing.")
+                return None
+
+    def _load_classifier(self):
+        # Transformers classifier for heading detection
+        pipeline = _import_transformers_pipeline()
+        if pipeline is None:
+            return None
+
+        try:
+            print("Loading transformer model...")
+            classifier = pipeline("text-classification", 
+                                  model="distilbert-base-uncased-finetuned-sst-2-english",
+                                  top_k=None)  # Fix the deprecated warning
+            print("✓ Transformer model loaded")
+            return classifier
+        except Exception as e:
+            print(f"Warning: Could not load transformer classifier: {e}")
+            return None
+
+    def _load_sentence_model(self):
+        # Sentence transformer for semantic similarity
+        SentenceTransformer = _import_sentence_transformer()
+        if SentenceTransformer is None:
+            return None
+
+        try:
+            print("Loading sentence transformer...")
+            sentence_model = SentenceTransformer(Config.SENTENCE_MODEL_NAME)
+            print("✓ Sentence transformer loaded")
+            return sentence_model
+        except Exception as e:
+            print(f"Warning: Could not load sentence transformer: {e}")
+            return None
+
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
@@ -210,16 +288,93 @@ class TextProcessor:
         if not sentences:
             return []
         
-        if self.sentence_model:
-            # Use sentence-transformers for high-quality embeddings
-            try:
-                embeddings = self.sentence_model.encode(sentences)
-                return embeddings.tolist()
-            except Exception as e:
-                print(f"Warning: Sentence embedding failed: {e}")
+        embeddings = self.encode(sentences, normalize=False)
+        if embeddings is not None:
+            return embeddings.tolist()
         
         # Fallback: return empty list
         return []
+
+    def encode(self, texts: List[str], normalize: bool = True) -> Optional[np.ndarray]:
+        """
+        Encode a list of texts in batches of Config.BATCH_SIZE. Returns an
+        (N, dim) array - L2-normalised unless normalize=False - or None when no
+        sentence model is available. Texts already in the embedding cache are
+        not re-encoded.
+        """
+        if not self.sentence_model:
+            return None
+
+        texts = list(texts)
+        model_id = Config.SENTENCE_MODEL_NAME
+        vectors = [self.embedding_cache.get(model_id, text) for text in texts]
+
+        # Encode each distinct cache miss once
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            try:
+                # Use sentence-transformers for high-quality embeddings
+                encoded = np.asarray(self.sentence_model.encode(missing, batch_size=Config.BATCH_SIZE),
+                                     dtype=np.float32)
+            except Exception as e:
+                print(f"Warning: Sentence embedding failed: {e}")
+                return None
+
+            encoded_by_text = dict(zip(missing, encoded))
+            for text, vector in encoded_by_text.items():
+                self.embedding_cache.put(model_id, text, vector)
+            vectors = [vector if vector is not None else encoded_by_text[text]
+                       for text, vector in zip(texts, vectors)]
+
+        embeddings = np.asarray(vectors, dtype=np.float32)
+
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings
+
+    def similarity_matrix(self, texts_a: List[str], texts_b: List[str]) -> np.ndarray:
+        """
+        Score every text in texts_a against every text in texts_b in one go.
+        Each list is encoded once and the (N, M) cosine similarity matrix is a
+        single matrix multiply of the normalised embeddings; without a sentence
+        model a vectorised word-overlap (Jaccard) matrix is returned instead.
+        """
+        if not texts_a or not texts_b:
+            return np.zeros((len(texts_a), len(texts_b)), dtype=np.float32)
+
+        embeddings_a = self.encode(texts_a)
+        embeddings_b = self.encode(texts_b) if embeddings_a is not None else None
+        if embeddings_a is not None and embeddings_b is not None:
+            return embeddings_a @ embeddings_b.T
+
+        return self._jaccard_matrix(texts_a, texts_b)
+
+    @staticmethod
+    def _jaccard_matrix(texts_a: List[str], texts_b: List[str]) -> np.ndarray:
+        """Word-overlap similarity for all pairs via binary bag-of-words matrices"""
+        token_sets_a = [set(re.findall(r'\b\w+\b', text.lower())) for text in texts_a]
+        token_sets_b = [set(re.findall(r'\b\w+\b', text.lower())) for text in texts_b]
+
+        vocabulary = {}
+        for tokens in token_sets_a + token_sets_b:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        def to_matrix(token_sets):
+            matrix = np.zeros((len(token_sets), max(len(vocabulary), 1)), dtype=np.float32)
+            for row, tokens in enumerate(token_sets):
+                matrix[row, [vocabulary[token] for token in tokens]] = 1.0
+            return matrix
+
+        matrix_a = to_matrix(token_sets_a)
+        matrix_b = to_matrix(token_sets_b)
+
+        intersection = matrix_a @ matrix_b.T
+        union = matrix_a.sum(axis=1)[:, None] + matrix_b.sum(axis=1)[None, :] - intersection
+
+        # Pairs where either text has no words have no intersection and score 0
+        return (intersection / np.maximum(union, 1.0)).astype(np.float32)
     
     def calculate_text_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity between two texts using ML when available"""
@@ -227,14 +382,9 @@ class TextProcessor:
             return 0.0
         
         # Try sentence-transformers first (most accurate)
-        if self.sentence_model:
-            try:
-                embeddings = self.sentence_model.encode([text1, text2])
-                from sklearn.metrics.pairwise import cosine_similarity
-                similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-                return float(similarity)
-            except Exception as e:
-                print(f"Warning: ML similarity failed: {e}")
+        embeddings = self.encode([text1, text2])
+        if embeddings is not None:
+            return float(embeddings[0] @ embeddings[1])
         
         # Try spaCy similarity (good accuracy)
         if self.nlp:
@@ -246,16 +396,7 @@ class TextProcessor:
                 print(f"Warning: spaCy similarity failed: {e}")
         
         # Fallback: Enhanced word overlap similarity
-        words1 = set(re.findall(r'\b\w+\b', text1.lower()))
-        words2 = set(re.findall(r'\b\w+\b', text2.lower()))
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
+        return float(self._jaccard_matrix([text1], [text2])[0, 0])
     
     # def is_heading_ml(self, text: str) -> tuple[bool, float]:
     #     """Use ML to detect if text is a heading with improved filtering"""
@@ -2,32 +2,225 @@
 Fallback text processing when PyMuPDF is not available
 """
 
+import io
 import re
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+import sys
+from collections import Counter
+from typing import List, Dict, Iterable, Tuple, Optional
+
+import numpy as np
+
+from shared import heading_rules
+from shared.config import Config
+from shared.heading_rules import BlockFeatures, FontThresholds
+
+# Page numbers, dates and counters differ from page to page of the same furniture line
+DIGITS_RE = re.compile(r'\d+')
 
 
-@dataclass
 class TextBlock:
-    """Represents a text block with formatting information"""
-    text: str
-    page_num: int
-    bbox: Tuple[float, float, float, float]  # x0, y0, x1, y1
-    font_size: float
-    font_name: str
-    font_flags: int
-    line_height: float
-    is_bold: bool = False
+    """
+    Represents a text block with formatting information.
+
+    One TextBlock is allocated per PDF line (its spans merged, see
+    pdf_utils._convert_blocks), so this is a slotted class (no per-instance
+    __dict__) rather than a dataclass. The bounding box is kept as four float
+    slots instead of a tuple (bbox rebuilds the tuple on access), and font
+    names are interned so lines sharing a font share one string.
+    """
+
+    __slots__ = ('text', 'page_num', 'x0', 'y0', 'x1', 'y1', 'font_size',
+                 'font_name', 'font_flags', 'line_height', 'is_bold')
+
+    def __init__(self, text: str, page_num: int,
+                 bbox: Tuple[float, float, float, float],  # x0, y0, x1, y1
+                 font_size: float, font_name: str, font_flags: int,
+                 line_height: float, is_bold: bool = False):
+        self.text = text
+        self.page_num = page_num
+        self.x0, self.y0, self.x1, self.y1 = bbox
+        self.font_size = font_size
+        self.font_name = sys.intern(font_name)
+        self.font_flags = font_flags
+        self.line_height = line_height
+        self.is_bold = is_bold
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        return (self.x0, self.y0, self.x1, self.y1)
+
+    @bbox.setter
+    def bbox(self, bbox: Tuple[float, float, float, float]):
+        self.x0, self.y0, self.x1, self.y1 = bbox
+
+    def _fields(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"TextBlock(text={self.text!r}, page_num={self.page_num!r}, bbox={self.bbox!r}, "
+                f"font_size={self.font_size!r}, font_name={self.font_name!r}, "
+                f"font_flags={self.font_flags!r}, line_height={self.line_height!r}, "
+                f"is_bold={self.is_bold!r})")
+
+
+class BlockColumns:
+    """
+    Columnar (NumPy) view of a list of TextBlocks, built once per batch of
+    blocks so numeric heading filters run as vectorised masks and only the
+    surviving candidates are inspected individually in Python.
+    """
+
+    def __init__(self, text_blocks: List[TextBlock]):
+        count = len(text_blocks)
+        self.blocks = text_blocks
+        self.texts = [block.text.strip() for block in text_blocks]
+
+        self.font_size = np.fromiter((block.font_size or 0 for block in text_blocks), dtype=np.float64, count=count)
+        self.page_num = np.fromiter((block.page_num for block in text_blocks), dtype=np.int32, count=count)
+        self.text_length = np.fromiter((len(text) for text in self.texts), dtype=np.int32, count=count)
+        self.word_count = np.fromiter((len(text.split()) for text in self.texts), dtype=np.int32, count=count)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def too_short_mask(self) -> np.ndarray:
+        """Blocks that can never be headings: under 3 characters or a single word"""
+        return (self.text_length < 3) | (self.word_count < 2)
+
+    def too_long_mask(self) -> np.ndarray:
+        return self.word_count > heading_rules.MAX_HEADING_WORDS
+
 
+class PageFurnitureIndex:
+    """
+    Repeated-line index used to recognise page furniture: running headers
+    and footers, page numbers and watermarks.
+
+    Lines are keyed on their normalised text (lower-cased, digit runs
+    collapsed) plus the vertical band they sit in. A key counts as furniture
+    once it occurs on at least Config.FURNITURE_MIN_PAGES distinct pages and
+    on Config.FURNITURE_MIN_PAGE_RATIO of the document's pages. Pages must be
+    added in order; only the last page and a distinct-page count are kept per
+    key.
+    """
+
+    def __init__(self):
+        self.pages = set()
+        self.keys = {}  # key -> [last page, distinct pages]
+
+    @staticmethod
+    def key_for(text: str, y0: float) -> Tuple[str, int]:
+        return DIGITS_RE.sub('#', text.lower()), int(round(y0 / Config.FURNITURE_BAND_HEIGHT))
+
+    def add_page(self, page_num: int):
+        self.pages.add(page_num)
 
-def extract_text_from_file(file_path: str) -> List[TextBlock]:
+    def add(self, key: Tuple[str, int], page_num: int):
+        """Count one line by its key_for() key"""
+        self.pages.add(page_num)
+        seen = self.keys.get(key)
+        if seen is None:
+            self.keys[key] = [page_num, 1]
+        elif seen[0] != page_num:
+            seen[0] = page_num
+            seen[1] += 1
+
+    def min_pages(self) -> float:
+        return max(Config.FURNITURE_MIN_PAGES, Config.FURNITURE_MIN_PAGE_RATIO * len(self.pages))
+
+    def is_furniture(self, key: Tuple[str, int], min_pages: Optional[float] = None) -> bool:
+        seen = self.keys.get(key)
+        return seen is not None and seen[1] >= (min_pages if min_pages is not None else self.min_pages())
+
+
+class FontHistogram:
     """
-    Extract text from a simple text file as fallback
+    Single-pass histogram of span font sizes.
+
+    Built once per document (during extraction, or incrementally while
+    streaming) and shared by heading detection and text statistics, so the
+    mode, mean and percentiles are all derived from the same counts without
+    rescanning the text blocks.
+    """
+
+    QUANTUM = 0.5  # Sizes are bucketed to the nearest half point
+    DEFAULT_SIZE = 12.0
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+        self._size_sum = 0.0
+
+    @classmethod
+    def from_blocks(cls, text_blocks: Iterable[TextBlock]) -> 'FontHistogram':
+        histogram = cls()
+        histogram.update_from_array(np.fromiter((block.font_size or 0 for block in text_blocks), dtype=np.float64))
+        return histogram
+
+    def add(self, font_size: float):
+        """Count one span; zero/missing sizes are ignored"""
+        if font_size:
+            self.counts[round(font_size / self.QUANTUM) * self.QUANTUM] += 1
+            self.total += 1
+            self._size_sum += font_size
+
+    def update(self, text_blocks: Iterable[TextBlock]):
+        for block in text_blocks:
+            self.add(block.font_size)
+
+    def update_from_array(self, font_sizes: np.ndarray):
+        """Vectorised add() for a column of font sizes"""
+        font_sizes = font_sizes[font_sizes > 0]
+        if not font_sizes.size:
+            return
+        buckets, counts = np.unique(np.round(font_sizes / self.QUANTUM) * self.QUANTUM, return_counts=True)
+        for size, count in zip(buckets.tolist(), counts.tolist()):
+            self.counts[size] += count
+        self.total += int(font_sizes.size)
+        self._size_sum += float(font_sizes.sum())
+
+    def mode(self) -> float:
+        """Most common size; ties resolve to the smallest size"""
+        if not self.counts:
+            return self.DEFAULT_SIZE
+        top_count = max(self.counts.values())
+        return min(size for size, count in self.counts.items() if count == top_count)
+
+    def mean(self) -> float:
+        return self._size_sum / self.total if self.total else self.DEFAULT_SIZE
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile (0-100) of the bucketed sizes"""
+        if not self.counts:
+            return self.DEFAULT_SIZE
+        rank = max(1, -(-self.total * percent // 100))  # ceiling
+        seen = 0
+        for size in sorted(self.counts):
+            seen += self.counts[size]
+            if seen >= rank:
+                return size
+        return max(self.counts)
+
+    def sizes(self) -> List[float]:
+        """Distinct bucketed sizes, ascending"""
+        return sorted(self.counts) or [self.DEFAULT_SIZE]
+
+
+def extract_text_from_file(file_path: str, data: Optional[bytes] = None) -> List[TextBlock]:
+    """
+    Extract text from a simple text file as fallback (from data, the file's
+    bytes already in memory, when given)
     """
     text_blocks = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        source = io.BytesIO(data) if data is not None else open(file_path, 'rb')
+        with io.TextIOWrapper(source, encoding='utf-8') as f:
             content = f.read()
         
         # Split into lines and create text blocks
@@ -54,175 +247,187 @@ def extract_text_from_file(file_path: str) -> List[TextBlock]:
         return []
 
 
-def detect_headings_from_text(text_blocks: List[TextBlock]) -> List[Dict]:
+def detect_headings_from_text(text_blocks: List[TextBlock],
+                              font_histogram: Optional[FontHistogram] = None,
+                              rule_hits: Optional[Counter] = None) -> List[Dict]:
     """
     Ultra-precise offline heading detection that filters out fragments and bullet points.
-    Uses advanced pattern matching and contextual analysis.
+    Uses advanced pattern matching and contextual analysis (see shared.heading_rules).
+    Pass the document's FontHistogram when it is already known to avoid recounting
+    font sizes, and a Counter as rule_hits to collect per-rule hit counts.
     """
     if not text_blocks:
         return []
 
-    # Analyze font distribution for intelligent size-based detection
-    font_sizes = [block.font_size for block in text_blocks if block.font_size]
-    if not font_sizes:
-        body_font_size = 12.0
-        large_font_threshold = 14.0
-        very_large_font_threshold = 16.0
-    else:
-        body_font_size = max(set(font_sizes), key=font_sizes.count)
-        large_font_threshold = body_font_size + 2
-        very_large_font_threshold = body_font_size + 4
-
-    headings = []
-    
-    for block in text_blocks:
-        text = block.text.strip()
-        if not text or len(text) < 3:
-            continue
-            
-        words = text.split()
-        
-        # STRICT EXCLUSION RULES - Filter out non-headings
-        # Rule: Exclude fragments (incomplete sentences)
-        if (text.startswith(('and ', 'or ', 'the ', 'of ', 'in ', 'to ', 'for ', 'with ')) or
-            text.endswith((' and', ' or', ' the', ' of', ' in', ' to', ' for', ' with'))):
-            continue
-            
-        # Rule: Exclude bullet points and list items
-        if (text.startswith(('• ', '- ', '* ', '◦ ', '▪ ')) or
-            re.match(r'^\w\)\s', text) or  # a) b) c) format
-            re.match(r'^\d+\)\s', text)):  # 1) 2) 3) format
-            continue
-            
-        # Rule: Exclude sentences (contain common sentence indicators)
-        sentence_indicators = [
-            ' is ', ' are ', ' was ', ' were ', ' will ', ' would ', ' should ', ' could ',
-            ' have ', ' has ', ' had ', ' must ', ' may ', ' can ', ' shall ', ' do ', ' does ',
-            ' the ', ' this ', ' that ', ' these ', ' those ', ' a ', ' an '
-        ]
-        if any(indicator in text.lower() for indicator in sentence_indicators):
-            continue
-            
-        # Rule: Exclude lines that end with incomplete thoughts
-        if (text.endswith((' a', ' an', ' the', ' and', ' or', ' but', ' with', ' for', ' of', ' in')) or
-            len(words) > 12):  # Too long for a heading
-            continue
-            
-        # POSITIVE HEADING DETECTION RULES
-        level = None
-        confidence = 0
-        
-        # RULE 1: Numbered section headings (highest confidence)
-        if re.match(r'^\d+\.\s+[A-Z]', text):
-            level = 1
-            confidence = 0.95
-        elif re.match(r'^\d+\.\d+\s+[A-Z]', text):
-            level = 2
-            confidence = 0.95
-        elif re.match(r'^\d+\.\d+\.\d+\s+[A-Z]', text):
-            level = 3
-            confidence = 0.95
-            
-        # RULE 2: All caps (likely main headings)
-        elif (text.isupper() and 
-              2 <= len(words) <= 6 and 
-              not any(char in text for char in '.,;:')):
-            level = 1
-            confidence = 0.9
-            
-        # RULE 3: Large font size (structural headings)
-        elif block.font_size >= very_large_font_threshold:
-            if 2 <= len(words) <= 8:
-                level = 1
-                confidence = 0.85
-        elif block.font_size >= large_font_threshold:
-            if 2 <= len(words) <= 8:
-                level = 2
-                confidence = 0.8
-                
-        # RULE 4: Bold text with title characteristics
-        elif (block.is_bold and 
-              2 <= len(words) <= 6 and
-              (text.istitle() or text.endswith(':')) and
-              not any(char in text for char in '.,;')):
-            level = 2
-            confidence = 0.75
-            
-        # RULE 5: Title case with colon (section labels)
-        elif (text.endswith(':') and 
-              text.istitle() and 
-              2 <= len(words) <= 4):
-            level = 2
-            confidence = 0.8
-            
-        # RULE 6: Short title case phrases (subsection headings)
-        elif (text.istitle() and 
-              2 <= len(words) <= 5 and
-              not text.endswith(('.', ',', ';')) and
-              all(word[0].isupper() for word in words if word.isalpha())):
-            # Additional validation for H3
-            if not any(word.lower() in ['the', 'and', 'for', 'with', 'from'] for word in words):
-                level = 3
-                confidence = 0.7
-        
-        # Only add if we found a valid heading with sufficient confidence
-        if level and confidence >= 0.7:
-            headings.append({
-                'text': text,
-                'level': level,
-                'page_num': block.page_num,
-                'bbox': block.bbox,
-                'font_size': block.font_size,
-                'is_bold': block.is_bold,
-                'confidence': confidence
-            })
-    
-    return headings
+    detector = StreamingHeadingDetector(font_histogram, rule_hits)
+    detector.feed(text_blocks)
+    return detector.finish()
+
 
-def get_text_statistics(text_blocks: List[TextBlock]) -> Dict:
+class StreamingHeadingDetector:
     """
-    Get basic statistics about the text
+    Incremental form of detect_headings_from_text for page-by-page pipelines.
+
+    Pages are fed as they are parsed. Only the running font-size histogram,
+    the repeated-line (page furniture) index and the blocks that pass the
+    vectorised numeric pre-filter and the text-only exclusion rules are kept.
+    Every pre-filtered line is counted in the furniture index, whether or not
+    it is excluded. The heading rules run in finish(), once the body font
+    size and the lines repeated across pages are known: furniture is dropped
+    first, then the rest is classified, so the result is identical to the
+    all-at-once detection without holding every line in memory. A precomputed histogram
+    may be passed in, in which case it is used as-is instead of being built
+    from the fed blocks. rule_hits counts how often each rule fired.
     """
-    if not text_blocks:
-        return {
-            'total_blocks': 0,
-            'avg_font_size': 12.0,
-            'font_sizes': [12.0]
-        }
-    
-    font_sizes = [block.font_size for block in text_blocks]
+
+    def __init__(self, font_histogram: Optional[FontHistogram] = None,
+                 rule_hits: Optional[Counter] = None):
+        self.count_fonts = font_histogram is None
+        self.font_histogram = font_histogram if font_histogram is not None else FontHistogram()
+        self.rule_hits = rule_hits if rule_hits is not None else Counter()
+        self.furniture = PageFurnitureIndex()
+        self.eligible = []  # (furniture key, text, block) of blocks that pass the exclusions
+        self.candidates = []
+
+    def feed(self, text_blocks: Iterable[TextBlock]):
+        """Consume the text blocks of one or more pages"""
+        columns = BlockColumns(list(text_blocks))
+        if not len(columns):
+            return
+
+        if self.count_fonts:
+            self.font_histogram.update_from_array(columns.font_size)
+
+        # Vectorised numeric pre-filter: only short multi-word blocks survive
+        too_short = columns.too_short_mask()
+        too_long = columns.too_long_mask() & ~too_short
+        self.rule_hits['exclude:too_short'] += int(too_short.sum())
+        self.rule_hits['exclude:too_long'] += int(too_long.sum())
+
+        for page_num in np.unique(columns.page_num).tolist():
+            self.furniture.add_page(page_num)
+
+        for index in np.flatnonzero(~(too_short | too_long)).tolist():
+            block = columns.blocks[index]
+            text = columns.texts[index]
+            key = self.furniture.key_for(text, block.y0)
+            self.furniture.add(key, block.page_num)
+            if not heading_rules.is_excluded(text, text.split(), self.rule_hits):
+                self.eligible.append((key, text, block))
+
+    def finish(self, record_hits: bool = True) -> List[Dict]:
+        """
+        Drop page furniture, classify the remaining lines and return the
+        detected headings. Can be called again after feeding more pages; pass
+        record_hits=False for such intermediate calls so rule hits are not
+        counted twice.
+        """
+        # Body font is the most common size (12pt when nothing was measured)
+        body_font_size = self.font_histogram.mode()
+        thresholds = FontThresholds(large=body_font_size + 2, very_large=body_font_size + 4)
+        rule_hits = self.rule_hits if record_hits else None
+        min_pages = self.furniture.min_pages()
+
+        candidates = []
+        headings = []
+
+        for key, text, block in self.eligible:
+            if self.furniture.is_furniture(key, min_pages):
+                if rule_hits is not None:
+                    rule_hits['exclude:furniture'] += 1
+                continue
+
+            features = BlockFeatures(text, text.split(), block.font_size, block.is_bold)
+            candidates.append((features, block))
+            level, confidence = heading_rules.classify(features, thresholds, rule_hits)
+
+            # Only add if we found a valid heading with sufficient confidence
+            if level:
+                headings.append({
+                    'text': features.text,
+                    'level': level,
+                    'page_num': block.page_num,
+                    'bbox': block.bbox,
+                    'font_size': block.font_size,
+                    'is_bold': block.is_bold,
+                    'confidence': confidence
+                })
+
+        self.candidates = candidates
+        return headings
+
+
+def get_text_statistics(text_blocks: List[TextBlock],
+                        font_histogram: Optional[FontHistogram] = None) -> Dict:
+    """
+    Get basic statistics about the text. font_sizes is the per-block list of
+    sizes; the other font figures come from one FontHistogram (built here if
+    the caller does not already have one).
+    """
+    if font_histogram is None:
+        font_histogram = FontHistogram.from_blocks(text_blocks)
     
     return {
         'total_blocks': len(text_blocks),
-        'avg_font_size': sum(font_sizes) / len(font_sizes),
-        'font_sizes': font_sizes
+        'avg_font_size': font_histogram.mean(),
+        'body_font_size': font_histogram.mode(),
+        'font_size_percentiles': {
+            p: font_histogram.percentile(p) for p in (50, 90, 99)
+        },
+        'font_sizes': [block.font_size for block in text_blocks] or [FontHistogram.DEFAULT_SIZE],
+        'distinct_font_sizes': font_histogram.sizes()
     }
 
 
-def extract_document_structure(file_path: str) -> Dict:
+class Document:
+    """
+    The extraction contract: raw per-line features of one document.
+
+    Extraction only produces text_blocks. Derived products - the font
+    histogram, headings and statistics - are computed on first access and
+    memoised, so each stage runs at most once per document and only if some
+    caller needs it. rule_hits counts the heading rules that fired while the
+    headings were detected.
+    """
+
+    def __init__(self, text_blocks: List[TextBlock], source: str = "",
+                 font_histogram: Optional[FontHistogram] = None):
+        self.text_blocks = text_blocks
+        self.source = source
+        self.rule_hits = Counter()
+        self.candidate_count = 0
+        self._font_histogram = font_histogram
+        self._headings = None
+        self._statistics = None
+
+    def __len__(self) -> int:
+        return len(self.text_blocks)
+
+    @property
+    def font_histogram(self) -> FontHistogram:
+        if self._font_histogram is None:
+            self._font_histogram = FontHistogram.from_blocks(self.text_blocks)
+        return self._font_histogram
+
+    @property
+    def headings(self) -> List[Dict]:
+        if self._headings is None:
+            detector = StreamingHeadingDetector(self.font_histogram, self.rule_hits)
+            detector.feed(self.text_blocks)
+            self._headings = detector.finish()
+            self.candidate_count = len(detector.candidates)
+        return self._headings
+
+    @property
+    def statistics(self) -> Dict:
+        if self._statistics is None:
+            self._statistics = get_text_statistics(self.text_blocks, self.font_histogram)
+        return self._statistics
+
+
+def extract_document_structure(file_path: str, data: Optional[bytes] = None) -> Document:
     """
     Extract document structure from a text file
     """
     print(f"Processing text file: {file_path}")
-    
-    # Extract text blocks
-    text_blocks = extract_text_from_file(file_path)
-    
-    if not text_blocks:
-        return {
-            'text_blocks': [],
-            'headings': [],
-            'statistics': get_text_statistics([])
-        }
-    
-    # Detect headings
-    headings = detect_headings_from_text(text_blocks)
-    
-    # Get statistics
-    statistics = get_text_statistics(text_blocks)
-    
-    return {
-        'text_blocks': text_blocks,
-        'headings': headings,
-        'statistics': statistics
-    }
+    return Document(extract_text_from_file(file_path, data), file_path)
@@ -0,0 +1,245 @@
+"""
+Benchmark harness for the Round 1A pipeline
+
+Times the three stages separately - extract_pdf_content, detect_headings_from_text
+and OutlineExtractor.extract_outline - over the PDFs in input/ plus generated
+synthetic documents, and writes machine-readable JSON so runs can be compared
+between commits:
+
+    python src/tools/benchmark.py --output bench.json
+    python src/tools/benchmark.py --sizes 10 50 --compare bench.json
+"""
+
+import os
+import sys
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from queue import Empty
+from typing import Dict, List, Optional
+
+# Add src to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.config import Config
+
+STAGES = ('extract', 'detect', 'outline')
+DEFAULT_SIZES = (10, 50, 500, 5000)
+POLL_INTERVAL = 0.5  # seconds between checks that a stage process is still alive
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_stage(stage: str, pdf_path: str, queue):
+    """
+    Run one stage on one document inside a fresh process and report timings,
+    counts and the process' peak RSS. Inputs a stage depends on (e.g. the text
+    blocks for 'detect') are prepared before the timer starts.
+    """
+    from round1a.outline_extractor import OutlineExtractor
+    from shared.metrics import PipelineMetrics
+    from shared.pdf_utils import extract_pdf_content
+    from shared.text_utils import detect_headings_from_text
+
+    spans = lines = headings = pages = 0
+    # Spans are merged into line-level TextBlocks, so they are counted by the metrics
+    metrics = PipelineMetrics()
+
+    if stage == 'extract':
+        wall, cpu = time.perf_counter(), time.process_time()
+        document = extract_pdf_content(pdf_path, metrics=metrics)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        spans = metrics.counters['spans']
+        lines = len(document.text_blocks)
+    elif stage == 'detect':
+        document = extract_pdf_content(pdf_path, metrics=metrics)
+        spans = metrics.counters['spans']
+        lines = len(document.text_blocks)
+        font_histogram = document.font_histogram
+        wall, cpu = time.perf_counter(), time.process_time()
+        headings = len(detect_headings_from_text(document.text_blocks, font_histogram))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    else:
+        extractor = OutlineExtractor()
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = extractor.extract_outline(pdf_path)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        headings = len(result['outline'])
+
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        pages = len(doc)
+
+    queue.put({
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'pages': pages,
+        'spans': spans,
+        'lines': lines,
+        'headings': headings,
+        'peak_rss_mb': _peak_rss_mb()
+    })
+
+
+def _collect(process, queue) -> Optional[Dict]:
+    """The stage process' report, or None if it died without sending one"""
+    while True:
+        try:
+            return queue.get(timeout=POLL_INTERVAL)
+        except Empty:
+            if process.is_alive():
+                continue
+        # The report may have been flushed just before the process exited
+        try:
+            return queue.get(timeout=POLL_INTERVAL)
+        except Empty:
+            return None
+
+
+def measure(stage: str, pdf_path: str, repeat: int) -> Dict:
+    """
+    Run a stage `repeat` times, each in a fresh spawned process; keep the median.
+    Raises RuntimeError if a stage process crashes (e.g. killed by the OS).
+    """
+    context = multiprocessing.get_context('spawn')
+    runs = []
+
+    for _ in range(repeat):
+        queue = context.Queue()
+        process = context.Process(target=_run_stage, args=(stage, pdf_path, queue))
+        process.start()
+        run = _collect(process, queue)
+        process.join()
+        if run is None:
+            raise RuntimeError(f"{stage} stage on {Path(pdf_path).name} failed "
+                               f"(process exit code {process.exitcode})")
+        runs.append(run)
+
+    wall = statistics.median(run['wall_s'] for run in runs)
+    result = dict(runs[0])
+    result.update({
+        'wall_s': wall,
+        'cpu_s': statistics.median(run['cpu_s'] for run in runs),
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'pages_per_s': result['pages'] / wall if wall else 0.0,
+        'spans_per_s': result['spans'] / wall if wall and result['spans'] else None,
+        'runs': [run['wall_s'] for run in runs]
+    })
+    return result
+
+
+def prepare_documents(input_dir: Path, work_dir: Path, sizes: List[int]) -> List[Path]:
+    """The PDFs of input_dir plus synthetic documents (generated once, then reused)"""
+    documents = sorted(input_dir.glob("*.pdf")) if input_dir.is_dir() else []
+
+    if sizes:
+        from tools.synthetic_pdf import generate_pdf
+
+        work_dir.mkdir(parents=True, exist_ok=True)
+        for pages in sizes:
+            path = work_dir / f"synthetic_{pages}p.pdf"
+            if not path.exists():
+                print(f"Generating {path.name}...")
+                generate_pdf(str(path), pages=pages, seed=pages)
+            documents.append(path)
+
+    return documents
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: List[Dict], baseline: Optional[Dict] = None):
+    """Human-readable view of the results, with deltas against a baseline run"""
+    previous = {}
+    if baseline:
+        previous = {(r['document'], r['stage']): r for r in baseline['results']}
+
+    print(f"{'document':<40} {'stage':<8} {'pages':>6} {'wall s':>9} {'pages/s':>10} {'spans/s':>11} {'RSS MB':>8}")
+    for r in results:
+        spans_per_s = f"{r['spans_per_s']:.0f}" if r['spans_per_s'] else '-'
+        line = (f"{r['document'][:40]:<40} {r['stage']:<8} {r['pages']:>6} {r['wall_s']:>9.3f} "
+                f"{r['pages_per_s']:>10.1f} {spans_per_s:>11} {r['peak_rss_mb']:>8.1f}")
+        old = previous.get((r['document'], r['stage']))
+        if old and old['wall_s']:
+            line += f"  {(r['wall_s'] / old['wall_s'] - 1) * 100:+.1f}% time"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Round 1A pipeline benchmark')
+    parser.add_argument('--input', default='./input', help='Directory of real PDFs to include')
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(DEFAULT_SIZES),
+                        help='Page counts of synthetic documents (none to skip)')
+    parser.add_argument('--work-dir', default=os.path.join(Config.TEMP_DIR, 'bench'),
+                        help='Where synthetic documents are generated and reused')
+    parser.add_argument('--stages', nargs='*', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median is kept)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Previous JSON results to compare against')
+    args = parser.parse_args()
+
+    documents = prepare_documents(Path(args.input), Path(args.work_dir), args.sizes)
+    if not documents:
+        print("No documents to benchmark")
+        sys.exit(1)
+
+    results = []
+    failures = []
+    for document in documents:
+        for stage in args.stages:
+            try:
+                result = measure(stage, str(document), args.repeat)
+            except RuntimeError as e:
+                print(f"Warning: {e}")
+                failures.append({'document': document.name, 'stage': stage, 'error': str(e)})
+                continue
+            result.update({'document': document.name, 'stage': stage})
+            results.append(result)
+
+    import fitz
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': results,
+        'failures': failures
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=Config.JSON_INDENT)
+        print(f"Results written to {args.output}")
+
+    if failures:
+        print(f"{len(failures)} stage(s) failed: "
+              f"{', '.join(f['stage'] + ' on ' + f['document'] for f in failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Deterministic synthetic PDF generator for benchmarks and load tests
+
+Generates documents with a known (ground-truth) outline so that both the
+throughput and the accuracy of the Round 1A pipeline can be measured at
+production scale:
+
+    python src/tools/synthetic_pdf.py generate --output-dir temp/corpus --preset all --pages 50
+    python src/main.py --input temp/corpus --output temp/corpus_out
+    python src/tools/synthetic_pdf.py evaluate --truth-dir temp/corpus --output-dir temp/corpus_out
+"""
+
+import os
+import sys
+import argparse
+import json
+import random
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# Add src to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.config import Config
+
+WORDS = ("data system process model analysis result method design test review "
+         "report value service network policy budget team project quality user "
+         "market growth energy health research support access training plan").split()
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter
+HUGE_PAGE_WIDTH = 14400  # PDF maximum, so huge spans are not clipped by the page
+MARGIN = 72
+COLUMN_GAP = 24
+LINE_SPACING = 1.4
+
+# Base-14 font pairs (regular, bold) selectable by name
+FONTS = {
+    'helvetica': ('helv', 'hebo'),
+    'times': ('tiro', 'tibo'),
+    'courier': ('cour', 'cobo'),
+}
+
+HEADING_SIZES = {1: 18, 2: 14, 3: 12}
+
+
+@dataclass
+class DocumentSpec:
+    """Shape of one synthetic document"""
+    pages: int = 10
+    seed: int = 0
+    heading_depth: int = 2          # deepest heading level generated (1-3)
+    numbered: bool = True           # "2.1 Title" style headings
+    font: str = 'helvetica'         # key of FONTS
+    body_size: float = 11
+    columns: int = 1
+    bold_runs: bool = False         # bold words inside body lines
+    bookmarks: bool = False         # embed the outline as the PDF's table of contents
+    running_headers: bool = False   # page furniture: running header and "Page n of N" footer
+    pathology: Optional[str] = None  # None, 'huge_spans' or 'tiny_spans'
+
+
+PRESETS = {
+    'report': DocumentSpec(),
+    'deep': DocumentSpec(heading_depth=3),
+    'unnumbered': DocumentSpec(numbered=False, font='times'),
+    'two_column': DocumentSpec(columns=2, bold_runs=True),
+    'bookmarked': DocumentSpec(heading_depth=3, bookmarks=True),
+    'running_headers': DocumentSpec(running_headers=True, font='times'),
+    'huge_spans': DocumentSpec(pathology='huge_spans'),
+    'tiny_spans': DocumentSpec(pathology='tiny_spans', font='courier'),
+}
+
+
+# ---------------------------------------------------------------------------
+# Generation
+# ---------------------------------------------------------------------------
+
+def _sentence(rng: random.Random, min_words: int = 8, max_words: int = 14) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + " is described here."
+
+
+def _title(rng: random.Random, words: int = 3) -> str:
+    return " ".join(rng.choice(WORDS).capitalize() for _ in range(words))
+
+
+def _items(spec: DocumentSpec, rng: random.Random) -> Iterator[Tuple[int, str]]:
+    """
+    Endless stream of (level, text) items; level 0 is a body line. Section
+    numbers are tracked so nested headings are numbered consistently.
+    """
+    numbers = [0, 0, 0]
+    yield 1, _heading_text(spec, rng, numbers, 1)
+
+    while True:
+        roll = rng.random()
+        level = 0
+        if roll < 0.03:
+            level = 1
+        elif roll < 0.08 and spec.heading_depth >= 2 and numbers[0]:
+            level = 2
+        elif roll < 0.11 and spec.heading_depth >= 3 and numbers[1]:
+            level = 3
+
+        if level:
+            yield level, _heading_text(spec, rng, numbers, level)
+        else:
+            yield 0, _sentence(rng)
+
+
+def _heading_text(spec: DocumentSpec, rng: random.Random, numbers: List[int], level: int) -> str:
+    numbers[level - 1] += 1
+    for deeper in range(level, len(numbers)):
+        numbers[deeper] = 0
+
+    title = _title(rng, rng.randint(2, 4))
+    if not spec.numbered:
+        return title
+    number = ".".join(str(n) for n in numbers[:level])
+    return f"{number}. {title}" if level == 1 else f"{number} {title}"
+
+
+def _write_line(shape, x: float, y: float, text: str, spec: DocumentSpec, rng: random.Random):
+    """Write one body line, split into several spans where the spec asks for it"""
+    regular, bold = FONTS[spec.font]
+
+    if spec.pathology == 'tiny_spans':
+        # Every word its own span: alternate fonts so PyMuPDF cannot merge them
+        for index, word in enumerate(text.split()):
+            fontname = FONTS['times'][0] if index % 2 else regular
+            shape.insert_text((x, y), word, fontsize=spec.body_size, fontname=fontname)
+            x += fitz.get_text_length(word + " ", fontname=fontname, fontsize=spec.body_size)
+        return
+
+    if spec.bold_runs and rng.random() < 0.3:
+        words = text.split()
+        start = rng.randrange(len(words))
+        end = min(len(words), start + rng.randint(1, 3))
+        runs = [(" ".join(words[:start]), regular), (" ".join(words[start:end]), bold),
+                (" ".join(words[end:]), regular)]
+        for run, fontname in runs:
+            if run:
+                shape.insert_text((x, y), run, fontsize=spec.body_size, fontname=fontname)
+                x += fitz.get_text_length(run + " ", fontname=fontname, fontsize=spec.body_size)
+        return
+
+    shape.insert_text((x, y), text, fontsize=spec.body_size, fontname=regular)
+
+
+def generate_pdf(path: str, pages: int = 10, seed: int = 0, **options) -> Dict:
+    """
+    Write a synthetic PDF to path and return its ground-truth outline in the
+    Round 1A output format. options are DocumentSpec fields.
+    """
+    return generate_document(path, DocumentSpec(pages=pages, seed=seed, **options))
+
+
+def generate_document(path: str, spec: DocumentSpec) -> Dict:
+    """Write the PDF described by spec and return its ground truth"""
+    rng = random.Random(spec.seed)
+    items = _items(spec, rng)
+    regular, bold = FONTS[spec.font]
+
+    page_width = HUGE_PAGE_WIDTH if spec.pathology == 'huge_spans' else PAGE_WIDTH
+    column_width = (page_width - 2 * MARGIN - (spec.columns - 1) * COLUMN_GAP) / spec.columns
+
+    doc = fitz.open()
+    outline = []
+
+    for page_index in range(spec.pages):
+        page = doc.new_page(width=page_width, height=PAGE_HEIGHT)
+        # One shape per page: committing per line is far slower for big documents
+        shape = page.new_shape()
+
+        if spec.running_headers:
+            shape.insert_text((MARGIN, MARGIN / 2), "Synthetic Corpus Annual Review", fontsize=9, fontname=bold)
+            shape.insert_text((page_width - MARGIN - 60, PAGE_HEIGHT - MARGIN / 2),
+                              f"Page {page_index + 1} of {spec.pages}", fontsize=9, fontname=regular)
+
+        for column in range(spec.columns):
+            x = MARGIN + column * (column_width + COLUMN_GAP)
+            y = MARGIN
+
+            while y < PAGE_HEIGHT - MARGIN - 40:
+                level, text = next(items)
+
+                if level:
+                    size = HEADING_SIZES[level]
+                    shape.insert_text((x, y), text, fontsize=size, fontname=bold)
+                    outline.append({"level": f"H{level}", "text": text, "page": page_index + 1})
+                    y += size * LINE_SPACING + 6
+                    continue
+
+                if spec.pathology == 'huge_spans':
+                    # Thousands of characters in a single span
+                    text = " ".join(_sentence(rng) for _ in range(60))
+                elif spec.columns > 1:
+                    text = " ".join(text.split()[:7])
+
+                _write_line(shape, x, y, text, spec, rng)
+                y += spec.body_size * LINE_SPACING
+
+        shape.commit()
+
+    if spec.bookmarks:
+        doc.set_toc([[int(h["level"][1:]), h["text"], h["page"]] for h in outline])
+    doc.set_metadata({'title': outline[0]["text"] if outline else "", 'producer': 'synthetic_pdf'})
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+    title = outline[0]["text"] if outline else ""
+    return {"title": title, "outline": outline}
+
+
+def generate_corpus(output_dir: str, presets: List[str], pages: int, count: int = 1,
+                    seed: int = 0) -> List[Path]:
+    """
+    Generate count documents per preset as <preset>_<n>.pdf, each with a
+    <preset>_<n>.truth.json ground-truth file next to it.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    for preset in presets:
+        for index in range(count):
+            spec = replace(PRESETS[preset], pages=pages, seed=seed + index)
+            pdf_path = output_path / f"{preset}_{index}.pdf"
+            truth = generate_document(str(pdf_path), spec)
+            truth['spec'] = asdict(spec)
+
+            with open(output_path / f"{preset}_{index}.truth.json", 'w', encoding='utf-8') as f:
+                json.dump(truth, f, indent=Config.JSON_INDENT, ensure_ascii=Config.ENSURE_ASCII)
+
+            print(f"Generated {pdf_path.name} ({pages} pages, {len(truth['outline'])} headings)")
+            written.append(pdf_path)
+
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Accuracy
+# ---------------------------------------------------------------------------
+
+def score_outline(predicted: Dict, truth: Dict) -> Dict:
+    """
+    Precision/recall/F1 of a predicted outline against the ground truth, both
+    strict (level, text and page must match) and text-only (text and page).
+    """
+    def prf(predicted_keys, truth_keys):
+        matched = sum(min(predicted_keys.count(key), truth_keys.count(key)) for key in set(truth_keys))
+        precision = matched / len(predicted_keys) if predicted_keys else 0.0
+        recall = matched / len(truth_keys) if truth_keys else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        return {'precision': precision, 'recall': recall, 'f1': f1}
+
+    predicted_items = predicted.get('outline', [])
+    truth_items = truth.get('outline', [])
+
+    return {
+        'strict': prf([(h['level'], h['text'], h['page']) for h in predicted_items],
+                      [(h['level'], h['text'], h['page']) for h in truth_items]),
+        'text': prf([(h['text'], h['page']) for h in predicted_items],
+                    [(h['text'], h['page']) for h in truth_items]),
+        'title_match': predicted.get('title') == truth.get('title')
+    }
+
+
+def evaluate(truth_dir: str, output_dir: str) -> Dict[str, Dict]:
+    """Score every <name>.json in output_dir against <name>.truth.json in truth_dir"""
+    scores = {}
+    for truth_file in sorted(Path(truth_dir).glob("*.truth.json")):
+        name = truth_file.name[:-len(".truth.json")]
+        output_file = Path(output_dir) / f"{name}.json"
+        if not output_file.exists():
+            print(f"Missing output for {name}")
+            continue
+
+        with open(truth_file, 'r', encoding='utf-8') as f:
+            truth = json.load(f)
+        with open(output_file, 'r', encoding='utf-8') as f:
+            predicted = json.load(f)
+
+        scores[name] = score_outline(predicted, truth)
+        strict, text = scores[name]['strict'], scores[name]['text']
+        print(f"{name:<24} strict P {strict['precision']:.2f} R {strict['recall']:.2f} F1 {strict['f1']:.2f}"
+              f"   text F1 {text['f1']:.2f}   title {'ok' if scores[name]['title_match'] else 'wrong'}")
+
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic PDF corpus generator and outline scorer')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = commands.add_parser('generate', help='Generate PDFs with ground-truth outlines')
+    generate_parser.add_argument('--output-dir', default=os.path.join(Config.TEMP_DIR, 'corpus'))
+    generate_parser.add_argument('--preset', nargs='+', default=['all'],
+                                 choices=['all'] + sorted(PRESETS))
+    generate_parser.add_argument('--pages', type=int, default=50)
+    generate_parser.add_argument('--count', type=int, default=1, help='Documents per preset')
+    generate_parser.add_argument('--seed', type=int, default=0)
+
+    evaluate_parser = commands.add_parser('evaluate', help='Score extracted outlines against ground truth')
+    evaluate_parser.add_argument('--truth-dir', default=os.path.join(Config.TEMP_DIR, 'corpus'))
+    evaluate_parser.add_argument('--output-dir', required=True, help='Directory of extracted <name>.json files')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        presets = sorted(PRESETS) if 'all' in args.preset else args.preset
+        generate_corpus(args.output_dir, presets, args.pages, args.count, args.seed)
+    else:
+        evaluate(args.truth_dir, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()